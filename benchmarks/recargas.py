@@ -0,0 +1,358 @@
+"""Mide cuánto tarda cada recarga (rerun) de las páginas de la aplicación.
+
+Ejecuta `Inicio.py` y cada página de `pages/` sin navegador con
+`streamlit.testing.v1.AppTest`, con la red bloqueada (las páginas usan sus
+respaldos locales) y el modelo local de prueba en lugar de Gemini
+(`LLM_LOCAL=1`). Cada escenario es una carga inicial seguida de algunas
+interacciones típicas con los widgets; por cada recarga se registra:
+
+- el tiempo de reloj (mediana de varias repeticiones, con las cachés ya
+  calientes por una pasada previa que no se mide);
+- el pico de memoria residente (RSS) del proceso durante la recarga;
+- la memoria asignada por Python en el pico (`tracemalloc`), medida en una
+  pasada aparte para no distorsionar los tiempos.
+
+Los resultados se comparan con la línea base guardada en
+`benchmarks/linea_base.json`, que también fija la tolerancia. El programa
+termina con código 1 si alguna recarga la supera por más de la tolerancia
+o si algún escenario medido no tiene línea base (salvo con `--guardar`).
+
+Uso, desde la raíz del proyecto:
+
+    python benchmarks/recargas.py --guardar     # crea o actualiza la línea base
+    python benchmarks/recargas.py               # compara contra la línea base
+    python benchmarks/recargas.py -e trata -e poblacion
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+LINEA_BASE = Path(__file__).resolve().parent / "linea_base.json"
+REPETICIONES = 3
+TOLERANCIA = 0.25
+# Márgenes absolutos para que el ruido en recargas muy cortas no cuente como regresión.
+MARGEN_SEGUNDOS = 0.05
+MARGEN_MB = 5.0
+TIMEOUT = 120
+
+METRICAS = {"segundos": MARGEN_SEGUNDOS, "rss_mb": MARGEN_MB, "asignado_mb": MARGEN_MB}
+
+
+# --- Entorno aislado -------------------------------------------------------
+
+def _sin_red(*args, **kwargs):
+    raise OSError("red deshabilitada durante los benchmarks")
+
+
+def preparar_entorno():
+    """Raíz del proyecto como directorio de trabajo, red bloqueada y modelo local."""
+    os.chdir(RAIZ)
+    if str(RAIZ) not in sys.path:
+        sys.path.insert(0, str(RAIZ))
+    os.environ["LLM_LOCAL"] = "1"
+    os.environ["LLM_LOCAL_RETARDO"] = "0"
+    socket.socket.connect = _sin_red
+    socket.socket.connect_ex = _sin_red
+    socket.create_connection = _sin_red
+    socket.getaddrinfo = _sin_red
+
+
+# --- Medición de memoria -----------------------------------------------------
+
+def _reiniciar_pico_rss():
+    # En Linux, escribir "5" en clear_refs reinicia VmHWM (el pico de RSS).
+    try:
+        with open("/proc/self/clear_refs", "w") as archivo:
+            archivo.write("5")
+    except OSError:
+        pass
+
+
+def _pico_rss_mb():
+    try:
+        with open("/proc/self/status") as archivo:
+            for linea in archivo:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS.
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+# --- Escenarios ------------------------------------------------------------
+
+def _widget(at, tipo, etiqueta, n=0):
+    """El `n`-ésimo widget de tipo `tipo` con la etiqueta `etiqueta`."""
+    encontrados = [w for w in getattr(at, tipo) if w.label == etiqueta]
+    if len(encontrados) <= n:
+        raise LookupError(f"no hay {tipo} con la etiqueta {etiqueta!r}")
+    return encontrados[n]
+
+
+class Escenario:
+    def __init__(self, nombre, pagina, pasos=()):
+        self.nombre = nombre
+        self.pagina = pagina
+        # Cada paso es (nombre, acción); la acción modifica widgets antes de la recarga.
+        self.pasos = [("carga", None), *pasos]
+
+
+def _filtrar_trata(at):
+    anios = _widget(at, "multiselect", "Selecciona Años")
+    anios.set_value(anios.value[-3:])
+
+
+def _filtrar_departamentos(at):
+    departamentos = _widget(at, "multiselect", "Selecciona Departamentos")
+    departamentos.set_value(departamentos.value[:5])
+
+
+def _cambiar_anio_torta(at):
+    anio = _widget(at, "selectbox", "📅 Selecciona un año")
+    anio.set_value(anio.options[0])
+
+
+def _preguntar(at):
+    _widget(at, "text_input", "Escribe tu pregunta o tema:").input("¿Qué casos hubo en 2008?")
+    _widget(at, "checkbox", "Mostrar la respuesta mientras se genera").uncheck()
+    _widget(at, "button", "Generar Respuesta").click()
+
+
+def _activar_filtros_poblacion(at):
+    for etiqueta in ("Filtrar por rango de edad", "Filtrar por ingreso mensual mínimo", "Filtrar personas sin vivienda propia"):
+        _widget(at, "checkbox", etiqueta).check()
+
+
+def _activar_fechas_poblacion(at):
+    _widget(at, "checkbox", "Filtrar por rango de fechas de nacimiento").check()
+    _widget(at, "checkbox", "Filtrar por municipios").check()
+
+
+def _poblacion_grande(at):
+    registros = _widget(at, "selectbox", "Número de registros")
+    registros.set_value(registros.options[-1])
+
+
+def _desactivar_filtros_poblacion(at):
+    for casilla in at.checkbox:
+        casilla.uncheck()
+
+
+def _promedio_minimo(at):
+    _widget(at, "slider", "Promedio mínimo:").set_value(3.5)
+
+
+def _columnas_estudiantes(at):
+    _widget(at, "multiselect", "Selecciona las columnas que deseas visualizar:").set_value(["nombre", "ciudad"])
+
+
+def _rango_anios(at):
+    _widget(at, "slider", "Año mínimo").set_value(1999)
+
+
+def _mostrar_peliculas(at):
+    _widget(at, "checkbox", "Mostrar todos los datos").check()
+
+
+def _actualizar_puntuacion(at):
+    _widget(at, "slider", "Nueva puntuación").set_value(9.0)
+    _widget(at, "button", "Actualizar puntuación").click()
+
+
+ESCENARIOS = [
+    Escenario("inicio", "Inicio.py"),
+    Escenario("m2_actividad_1", "pages/1_📌_M2 Actvidad 1.py"),
+    Escenario("m2_actividad_2", "pages/2_📌_M2 Actvidad 2.py", [
+        ("promedio", _promedio_minimo),
+        ("columnas", _columnas_estudiantes),
+    ]),
+    Escenario("poblacion", "pages/3_📌_M2 Actvidad 3.py", [
+        ("filtros", _activar_filtros_poblacion),
+        ("fechas_municipios", _activar_fechas_poblacion),
+        ("sin_filtros", _desactivar_filtros_poblacion),
+        ("mas_registros", _poblacion_grande),
+    ]),
+    Escenario("peliculas", "pages/4_📌_M2 Actvidad 4.py", [
+        ("todos", _mostrar_peliculas),
+        ("anios", _rango_anios),
+        ("puntuacion", _actualizar_puntuacion),
+    ]),
+    Escenario("m2_actividad_5", "pages/5_📌_M2 Actvidad 5.py"),
+    Escenario("m2_evaluacion", "pages/6_📋_M2 Evaluación.py"),
+    Escenario("m3_actividad_1", "pages/7_📌_M3 Actvidad 1.py"),
+    Escenario("m3_actividad_2", "pages/8_📌_M3 Actvidad 2.py"),
+    Escenario("m3_actividad_3", "pages/9_📌_M3 Actvidad 3.py"),
+    Escenario("m3_actividad_4", "pages/10_📌_M3 Actvidad 4.py"),
+    Escenario("m3_actividad_5", "pages/11_📌_M3 Actvidad 5.py"),
+    Escenario("m3_evaluacion", "pages/12_📋_M3 Evaluación.py"),
+    Escenario("trata", "pages/Proyecto_Integrador.py", [
+        ("anios", _filtrar_trata),
+        ("departamentos", _filtrar_departamentos),
+        ("anio_torta", _cambiar_anio_torta),
+        ("pregunta", _preguntar),
+    ]),
+]
+
+
+# --- Ejecución -------------------------------------------------------------
+
+class DependenciaFaltante(Exception):
+    """La página importa un paquete que no está instalado en este entorno."""
+
+
+def _recargar(at, accion):
+    if accion is not None:
+        accion(at)
+    at.run(timeout=TIMEOUT)
+    if at.exception:
+        error = at.exception[0]
+        if error.proto.type == "ModuleNotFoundError":
+            raise DependenciaFaltante(error.value)
+        raise RuntimeError(f"{error.proto.type}: {error.value}")
+
+
+def _pasada(escenario, medir_asignaciones=False):
+    """Ejecuta el escenario completo y devuelve {paso: métricas}."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(escenario.pagina, default_timeout=TIMEOUT)
+    medidas = {}
+    for nombre, accion in escenario.pasos:
+        _reiniciar_pico_rss()
+        if medir_asignaciones:
+            tracemalloc.start()
+            inicial = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        try:
+            _recargar(at, accion)
+        finally:
+            segundos = time.perf_counter() - inicio
+            if medir_asignaciones:
+                pico = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        if medir_asignaciones:
+            medidas[nombre] = {"asignado_mb": (pico - inicial) / (1024 * 1024)}
+        else:
+            medidas[nombre] = {"segundos": segundos, "rss_mb": _pico_rss_mb()}
+    return medidas
+
+
+def medir(escenario, repeticiones=REPETICIONES):
+    """Métricas por paso: mediana de tiempos, máximo de RSS y asignaciones."""
+    _pasada(escenario)  # Calienta cachés de Streamlit y de disco.
+    pasadas = [_pasada(escenario) for _ in range(repeticiones)]
+    asignaciones = _pasada(escenario, medir_asignaciones=True)
+    resultado = {}
+    for nombre, _ in escenario.pasos:
+        rss = [p[nombre]["rss_mb"] for p in pasadas if p[nombre]["rss_mb"] is not None]
+        resultado[nombre] = {
+            "segundos": statistics.median(p[nombre]["segundos"] for p in pasadas),
+            "rss_mb": max(rss) if rss else None,
+            "asignado_mb": asignaciones[nombre]["asignado_mb"],
+        }
+    return resultado
+
+
+def comparar(medidas, base, tolerancia=TOLERANCIA):
+    """Lista de regresiones `(paso, métrica, valor, base)` frente a la línea base."""
+    regresiones = []
+    for paso, valores in medidas.items():
+        referencia = base.get(paso)
+        if referencia is None:
+            continue
+        for metrica, margen in METRICAS.items():
+            valor, anterior = valores.get(metrica), referencia.get(metrica)
+            if valor is None or anterior is None:
+                continue
+            if valor > anterior * (1 + tolerancia) + margen:
+                regresiones.append((paso, metrica, valor, anterior))
+    return regresiones
+
+
+def _formato(valor, decimales):
+    return "-" if valor is None else f"{valor:.{decimales}f}"
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de recargas por página.")
+    parser.add_argument("-e", "--escenario", action="append", help="sólo los escenarios con este nombre (repetible)")
+    parser.add_argument("-r", "--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument(
+        "-t", "--tolerancia", type=float,
+        help=f"aumento relativo permitido (0.25 = 25%%); por defecto, el de la línea base o {TOLERANCIA}",
+    )
+    parser.add_argument("--base", type=Path, default=LINEA_BASE, help="archivo JSON de la línea base")
+    parser.add_argument("--guardar", action="store_true", help="guarda los resultados como nueva línea base")
+    opciones = parser.parse_args(argumentos)
+
+    escenarios = [e for e in ESCENARIOS if not opciones.escenario or e.nombre in opciones.escenario]
+    linea_base = json.loads(opciones.base.read_text(encoding="utf-8")) if opciones.base.exists() else {}
+    bases = linea_base.get("escenarios", {})
+    tolerancia = opciones.tolerancia
+    if tolerancia is None:
+        tolerancia = linea_base.get("tolerancia", TOLERANCIA)
+    if not bases and not opciones.guardar:
+        print(f"No hay línea base en {opciones.base}: la ejecución fallará (usa --guardar para crearla).")
+
+    preparar_entorno()
+    resultados, regresiones, fallidos, sin_base = {}, [], [], []
+    print(f"{'escenario':<16} {'paso':<18} {'segundos':>9} {'base':>9} {'rss MB':>8} {'asignado MB':>12}")
+    for escenario in escenarios:
+        try:
+            medidas = medir(escenario, opciones.repeticiones)
+        except DependenciaFaltante as e:
+            print(f"{escenario.nombre:<16} omitido: {e}")
+            continue
+        except Exception as e:
+            print(f"{escenario.nombre:<16} ERROR: {e}")
+            fallidos.append(escenario.nombre)
+            continue
+        resultados[escenario.nombre] = medidas
+        if escenario.nombre not in bases:
+            sin_base.append(escenario.nombre)
+        base = bases.get(escenario.nombre, {})
+        for paso, valores in medidas.items():
+            anterior = base.get(paso, {}).get("segundos")
+            print(
+                f"{escenario.nombre:<16} {paso:<18} {_formato(valores['segundos'], 3):>9} {_formato(anterior, 3):>9} "
+                f"{_formato(valores['rss_mb'], 1):>8} {_formato(valores['asignado_mb'], 2):>12}"
+            )
+        regresiones.extend((escenario.nombre, *r) for r in comparar(medidas, base, tolerancia))
+
+    if opciones.guardar:
+        # Los escenarios que no se midieron ahora conservan su línea base anterior.
+        linea_base = {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "tolerancia": tolerancia,
+            "escenarios": {**bases, **resultados},
+        }
+        opciones.base.write_text(json.dumps(linea_base, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Línea base guardada en {opciones.base}")
+        return 1 if fallidos else 0
+
+    for nombre, paso, metrica, valor, anterior in regresiones:
+        print(f"REGRESIÓN {nombre}/{paso}: {metrica} {valor:.3f} (línea base {anterior:.3f})")
+    if fallidos:
+        print(f"Escenarios con errores: {', '.join(fallidos)}")
+    if sin_base:
+        print(f"Escenarios sin línea base (usa --guardar): {', '.join(sin_base)}")
+    return 1 if regresiones or fallidos or sin_base else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,16 @@
+import io
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import sqlite3
+import requests
 import firebase_admin
 from firebase_admin import credentials, firestore
 
+from utils.base_datos import base_alumnos
+from utils.cargador import RESPALDO, Fuente, cargar_fuentes
+from utils.excel import leer_excel
+
 # Configuración de la página
 st.set_page_config(   
     page_icon="📌",
@@ -37,96 +43,103 @@ st.header("Solución")
 st.title("Actividad 1 - Creación de DataFrames")
 st.write("Objetivo: Familiarizarse con la creación de DataFrames en Pandas y mostrarlos usando Streamlit.")
 
+# Cada fuente se carga en un hilo aparte con su propio tiempo máximo y su
+# sección se dibuja apenas termina; una fuente lenta o caída no bloquea las
+# demás. Todas las llamadas a Streamlit ocurren en el hilo de la página.
+
 # Diccionario
-st.header("1. DataFrame de Libros")
 libros = {
     "título": ["1984", "Cien Años de Soledad", "Don Quijote", "El Principito"],
     "autor": ["George Orwell", "Gabriel García Márquez", "Miguel de Cervantes", "Antoine de Saint-Exupéry"],
     "año de publicación": [1949, 1967, 1605, 1943],
     "género": ["Distopía", "Realismo Mágico", "Novela", "Fábula"]
 }
-df_libros = pd.DataFrame(libros)
-st.dataframe(df_libros)
 
 # Lista de diccionarios
-st.header("2. Información de Ciudades")
 ciudades = [
     {"nombre": "Tokio", "población": 37400068, "país": "Japón"},
     {"nombre": "Delhi", "población": 28514000, "país": "India"},
     {"nombre": "Shanghái", "población": 25582000, "país": "China"}
 ]
-df_ciudades = pd.DataFrame(ciudades)
-st.dataframe(df_ciudades)
 
 # Lista de listas
-st.header("3. Productos en Inventario")
 productos = [
     ["Laptop", 1200, 10],
     ["Teclado", 25, 50],
     ["Mouse", 15, 75]
 ]
-df_productos = pd.DataFrame(productos, columns=["Producto", "Precio", "Stock"])
-st.dataframe(df_productos)
+
 
 # Series
-st.header("4. Datos de Personas")
-nombres = pd.Series(["Ana", "Luis", "Marta", "Carlos"])
-edades = pd.Series([25, 30, 22, 28])
-ciudades = pd.Series(["Madrid", "México", "Bogotá", "Buenos Aires"])
-df_personas = pd.DataFrame({"Nombre": nombres, "Edad": edades, "Ciudad": ciudades})
-st.dataframe(df_personas)
-
-# CSV local
-st.header("5. Datos desde CSV")
-try:
-    df_csv = pd.read_csv("./pages/data.csv")
-    st.dataframe(df_csv)
-except FileNotFoundError:
-    st.warning("Archivo 'data.csv' no encontrado.")
-
-# Excel local
-st.header("6. Datos desde Excel")
-try:
-    df_excel = pd.read_excel("./pages/data.xlsx", engine='openpyxl')
-    st.dataframe(df_excel)
-except FileNotFoundError:
-    st.warning("Archivo 'data.xlsx' no encontrado.")
-except ImportError:
-    st.warning("Necesitas instalar openpyxl: pip install openpyxl")
-
-# JSON local
-st.header("7. Datos de Usuarios desde JSON")
-try:
-    df_json = pd.read_json("./pages/data.json")
-    st.dataframe(df_json)
-except FileNotFoundError:
-    st.warning("Archivo 'data.json' no encontrado.")
-
-# URL externa (ejemplo con datos abiertos)
-st.header("8. Datos desde URL")
+def cargar_personas():
+    nombres = pd.Series(["Ana", "Luis", "Marta", "Carlos"])
+    edades = pd.Series([25, 30, 22, 28])
+    ciudades = pd.Series(["Madrid", "México", "Bogotá", "Buenos Aires"])
+    return pd.DataFrame({"Nombre": nombres, "Edad": edades, "Ciudad": ciudades})
+
+
+# URL externa (ejemplo con datos abiertos); sin red se usa la copia local
 url = "https://people.sc.fsu.edu/~jburkardt/data/csv/airtravel.csv"
-try:
-    df_url = pd.read_csv(url)
-    st.dataframe(df_url)
-except Exception as e:
-    st.warning(f"No se pudo cargar desde URL: {e}")
-
-# SQLite
-st.header("9. Datos desde SQLite")
-conn = sqlite3.connect("estudiantes.db")
-cursor = conn.cursor()
-cursor.execute("CREATE TABLE IF NOT EXISTS alumnos (nombre TEXT, calificación INTEGER)")
-cursor.execute("INSERT INTO alumnos VALUES ('Pedro', 85), ('Lucía', 90), ('Andrés', 78)")
-conn.commit()
-df_sqlite = pd.read_sql("SELECT * FROM alumnos", conn)
-st.dataframe(df_sqlite)
-conn.close()
+RESPALDO_URL = "./pages/airtravel.csv"
+TIMEOUT_URL = 5
+
+
+def cargar_url():
+    respuesta = requests.get(url, timeout=TIMEOUT_URL)
+    respuesta.raise_for_status()
+    return pd.read_csv(io.StringIO(respuesta.text))
+
 
 # NumPy
-st.header("10. Datos desde NumPy")
-array = np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
-df_numpy = pd.DataFrame(array, columns=["Columna A", "Columna B", "Columna C"])
-st.dataframe(df_numpy)
+def cargar_numpy():
+    array = np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    return pd.DataFrame(array, columns=["Columna A", "Columna B", "Columna C"])
+
+
+# La base se migra y se siembra una sola vez por proceso; la consulta queda
+# en caché hasta que cambien los datos.
+base = base_alumnos()
+
+# (título de la sección, fuente)
+secciones = [
+    ("1. DataFrame de Libros", Fuente("libros", lambda: pd.DataFrame(libros))),
+    ("2. Información de Ciudades", Fuente("ciudades", lambda: pd.DataFrame(ciudades))),
+    ("3. Productos en Inventario", Fuente("productos", lambda: pd.DataFrame(productos, columns=["Producto", "Precio", "Stock"]))),
+    ("4. Datos de Personas", Fuente("personas", cargar_personas)),
+    ("5. Datos desde CSV", Fuente("data.csv", lambda: pd.read_csv("./pages/data.csv"))),
+    ("6. Datos desde Excel", Fuente("data.xlsx", lambda: leer_excel("./pages/data.xlsx"))),
+    ("7. Datos de Usuarios desde JSON", Fuente("data.json", lambda: pd.read_json("./pages/data.json"))),
+    ("8. Datos desde URL", Fuente("airtravel.csv", cargar_url, timeout=TIMEOUT_URL + 1,
+                                  respaldo=lambda: pd.read_csv(RESPALDO_URL))),
+    ("9. Datos desde SQLite", Fuente("SQLite", lambda: base.consultar("SELECT * FROM alumnos ORDER BY rowid"))),
+    ("10. Datos desde NumPy", Fuente("NumPy", cargar_numpy)),
+]
+
+espacios = {}
+for titulo, fuente in secciones:
+    st.header(titulo)
+    espacios[fuente.nombre] = st.empty()
+    espacios[fuente.nombre].caption("⏳ Cargando…")
+
+
+def mostrar_fuente(resultado):
+    with espacios[resultado.nombre].container():
+        if resultado.estado == RESPALDO:
+            st.info(f"No se pudo cargar desde URL ({resultado.error}); se muestra la copia local.")
+        if resultado.datos is not None:
+            st.dataframe(resultado.datos)
+        elif isinstance(resultado.error, FileNotFoundError):
+            st.warning(f"Archivo '{resultado.nombre}' no encontrado.")
+        elif isinstance(resultado.error, ImportError):
+            st.warning("Necesitas instalar openpyxl: pip install openpyxl")
+        else:
+            st.warning(f"No se pudo cargar '{resultado.nombre}': {resultado.error}")
+
+
+resultados = cargar_fuentes([fuente for _, fuente in secciones], mostrar_fuente)
+
+with st.expander("⏱️ Tiempos de carga por fuente"):
+    st.dataframe(pd.DataFrame([r.fila() for r in resultados]).sort_values("segundos", ascending=False))
 
 st.header("11. Datos desde FireBase (opcional)")
 st.info("Esta sección requiere tener una base de datos en FireBase.")
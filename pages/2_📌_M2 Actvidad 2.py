@@ -1,7 +1,9 @@
 import streamlit as st
-import io
 import pandas as pd
 
+from utils.indices import IndiceRango
+from utils.perfil import perfil_csv
+
 
 # Configuración de la página
 st.set_page_config(   
@@ -33,17 +35,23 @@ st.markdown("""
 st.header("Solución")
 
 st.title("Análisis de Estudiantes en Colombia")
-@st.cache_data
+RUTA_DATOS = "./pages/estudiantes_colombia.csv"
 
+@st.cache_data
 def cargar_datos():
     try:
-        df = pd.read_csv("./pages/estudiantes_colombia.csv")
+        df = pd.read_csv(RUTA_DATOS)
         df["nombre"] = df["nombre"].astype(str)
         return df
     except Exception as e:
         st.error(f"Error al cargar los datos: {e}")
         return pd.DataFrame()
 
+@st.cache_resource
+def indice_promedio():
+    # Permutación ordenada por promedio: el filtro del slider es una búsqueda binaria.
+    return IndiceRango(cargar_datos(), ["promedio"])
+
 df = cargar_datos()
 
 if not df.empty:
@@ -53,13 +61,14 @@ if not df.empty:
     st.subheader("Últimas 5 filas del dataset")
     st.dataframe(df.tail())
 
+    # Estructura y estadísticas calculadas en una sola pasada por bloques sobre el CSV.
+    perfil = perfil_csv(RUTA_DATOS)
+
     with st.expander("📋 Resumen de estructura"):
-        buffer = io.StringIO()
-        df.info(buf=buffer)
-        st.code(buffer.getvalue(), language="text")
+        st.code(perfil.info(), language="text")
 
     with st.expander("📊 Resumen estadístico"):
-        st.dataframe(df.describe(include='all'), use_container_width=True)
+        st.dataframe(perfil.describe(), use_container_width=True)
 
     st.subheader("Seleccionar columnas específicas")
     columnas = st.multiselect("Selecciona las columnas que deseas visualizar:", df.columns.tolist(), default=["nombre", "edad", "promedio"])
@@ -68,7 +77,7 @@ if not df.empty:
 
     st.subheader("Filtrar estudiantes por promedio mínimo")
     min_promedio = st.slider("Promedio mínimo:", min_value=0.0, max_value=5.0, step=0.1, value=4.0)
-    filtro_df = df[df["promedio"] >= min_promedio]
+    filtro_df = df.iloc[indice_promedio().filas("promedio", min_promedio)]
     st.write(f"Estudiantes con promedio mayor o igual a {min_promedio}:")
     st.dataframe(filtro_df)
 else:
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
-import random
 from datetime import datetime
 
+from utils.filtros import Contiene, EnLista, EsNulo, Rango
+from utils.poblacion import CIUDADES, OCUPACIONES, SEMILLA, filtros_poblacion, poblacion
+from utils.tabla import tabla_paginada
+
 # Configuración de la página
 st.set_page_config(page_icon="📌", layout="wide")
 
@@ -36,30 +39,16 @@ st.subheader("Enlace al Notebook de Google Colab:")
 colab_link = "https://colab.research.google.com/drive/1KMgNIzFmyDXsLEAhNAecdq3btaVF5iW0?usp=sharing"
 st.markdown(f"[Haz clic aquí para acceder al Notebook de Google Colab]({colab_link})")
 
-# Generación de datos simulados
-nombres = ['Ana', 'Luis', 'Carlos', 'María', 'Pedro', 'Laura', 'Jorge', 'Sofía', 'Andrés', 'Valentina']
-ciudades = ['Bogotá', 'Medellín', 'Cali', 'Barranquilla', 'Cartagena']
-ocupaciones = ['Estudiante', 'Empleado', 'Desempleado', 'Independiente', 'Docente', 'Ingeniero', 'Médico', 'Emprendedor', 'Pensionado']
-viviendas = ['Propia', 'Arriendo', 'Familiar']
-sectores = ['Salud', 'Educación', 'Tecnología', 'Comercio', 'Otro']
-regiones = ['Andina', 'Caribe', 'Pacífica', 'Orinoquía', 'Amazonía']
-
-datos = []
-for _ in range(100):
-    datos.append({
-        'nombre_completo': random.choice(nombres),
-        'municipio': random.choice(ciudades),
-        'edad': random.randint(15, 75),
-        'ocupacion': random.choice(ocupaciones),
-        'tipo_vivienda': random.choice(viviendas),
-        'sector': random.choice(sectores),
-        'region': random.choice(regiones),
-        'ingreso_mensual': None if random.random() < 0.05 else random.randint(800_000, 12_000_000),
-        'acceso_internet': random.choice([True, False]),
-        'fecha_nacimiento': pd.to_datetime(random.choice(pd.date_range("1949-01-01", "2009-12-31")))
-    })
-
-df = pd.DataFrame(datos)
+# Generación de datos simulados (vectorizada, reproducible y en caché)
+gcol1, gcol2 = st.columns(2)
+with gcol1:
+    n_registros = st.selectbox("Número de registros", [100, 10_000, 100_000, 1_000_000])
+with gcol2:
+    semilla = st.number_input("Semilla", min_value=0, value=SEMILLA, step=1)
+
+ciudades = CIUDADES
+ocupaciones = OCUPACIONES
+df = poblacion(n_registros, int(semilla))
 
 # Interfaz en dos columnas
 col1, col2 = st.columns([3, 1])
@@ -68,7 +57,8 @@ col1, col2 = st.columns([3, 1])
 with col1:
     st.title("📊 Aplicación de Filtros Dinámicos")
     st.markdown("Filtra los datos usando los controles en la barra lateral.")
-    df_filtrado = df.copy()
+    # Cada filtro activo agrega un predicado; se evalúan todos juntos al final.
+    predicados = []
 
 # Columna derecha - Filtros
 with col2:
@@ -77,7 +67,7 @@ with col2:
     # 1. Rango de edad
     if st.checkbox("Filtrar por rango de edad"):
         min_edad, max_edad = st.slider("Selecciona el rango de edad", 15, 75, (20, 60))
-        df_filtrado = df_filtrado[df_filtrado["edad"].between(min_edad, max_edad)]
+        predicados.append(Rango("edad", min_edad, max_edad))
 
     # 2. Municipios
     if st.checkbox("Filtrar por municipios"):
@@ -85,42 +75,42 @@ with col2:
         municipios.sort()
         municipios_seleccionados = st.multiselect("Selecciona municipios", municipios)
         if municipios_seleccionados:
-            df_filtrado = df_filtrado[df_filtrado["municipio"].isin(municipios_seleccionados)]
+            predicados.append(EnLista("municipio", municipios_seleccionados))
 
     # 3. Ingreso mensual mínimo
     if st.checkbox("Filtrar por ingreso mensual mínimo"):
         ingreso_min = st.slider("Ingreso mínimo (COP)", 800_000, 12_000_000, 2_000_000, step=100_000)
-        df_filtrado = df_filtrado[df_filtrado["ingreso_mensual"] > ingreso_min]
+        predicados.append(Rango("ingreso_mensual", ingreso_min, incluir_minimo=False))
 
     # 4. Ocupación
     if st.checkbox("Filtrar por ocupación"):
         ocupaciones_sel = st.multiselect("Selecciona ocupaciones", ocupaciones)
         if ocupaciones_sel:
-            df_filtrado = df_filtrado[df_filtrado["ocupacion"].isin(ocupaciones_sel)]
+            predicados.append(EnLista("ocupacion", ocupaciones_sel))
 
     # 5. No vivienda propia
     if st.checkbox("Filtrar personas sin vivienda propia"):
-        df_filtrado = df_filtrado[df_filtrado["tipo_vivienda"] != "Propia"]
+        predicados.append(EnLista("tipo_vivienda", ["Propia"], negar=True))
 
     # 6. Contiene en nombre
     if st.checkbox("Filtrar por nombre"):
         subcadena = st.text_input("Buscar en nombre")
         if subcadena:
-            df_filtrado = df_filtrado[df_filtrado["nombre_completo"].str.contains(subcadena, case=False, na=False)]
+            predicados.append(Contiene("nombre_completo", subcadena))
 
     # 7. Año de nacimiento
     if st.checkbox("Filtrar por año de nacimiento"):
         año = st.selectbox("Selecciona el año", list(range(1949, 2010)))
-        df_filtrado = df_filtrado[df_filtrado["fecha_nacimiento"].dt.year == año]
+        predicados.append(Rango("fecha_nacimiento", datetime(año, 1, 1), datetime(año + 1, 1, 1), incluir_maximo=False))
 
     # 8. Acceso a internet
     if st.checkbox("Filtrar por acceso a internet"):
         acceso = st.radio("¿Tiene acceso a internet?", ["Sí", "No"])
-        df_filtrado = df_filtrado[df_filtrado["acceso_internet"] == (acceso == "Sí")]
+        predicados.append(EnLista("acceso_internet", [acceso == "Sí"]))
 
     # 9. Ingreso mensual nulo
     if st.checkbox("Filtrar por ingresos nulos"):
-        df_filtrado = df_filtrado[df_filtrado["ingreso_mensual"].isnull()]
+        predicados.append(EsNulo("ingreso_mensual"))
 
     # 10. Rango de fechas nacimiento
     if st.checkbox("Filtrar por rango de fechas de nacimiento"):
@@ -128,9 +118,11 @@ with col2:
         f2 = st.date_input("Fecha fin", datetime(2009, 12, 31))
         f1 = pd.to_datetime(f1)  # Conversión clave
         f2 = pd.to_datetime(f2)
-        df_filtrado = df_filtrado[df_filtrado["fecha_nacimiento"].between(f1, f2)]
+        predicados.append(Rango("fecha_nacimiento", f1, f2))
 
-# Mostrar resultados filtrados
+# Mostrar resultados filtrados: una sola pasada sobre los datos, o el
+# resultado guardado si esta combinación de filtros ya se había usado.
+filas = filtros_poblacion(n_registros, int(semilla)).filas(predicados)
 with col1:
-    st.markdown(f"### Resultados: {df_filtrado.shape[0]} registros encontrados")
-    st.dataframe(df_filtrado)
\ No newline at end of file
+    st.markdown(f"### Resultados: {len(df) if filas is None else len(filas)} registros encontrados")
+    tabla_paginada(df, filas=filas, clave="poblacion")
\ No newline at end of file
@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 
+from utils.ediciones import Ediciones, ediciones
+from utils.indices import IndiceRango
+
 # Configuración de la página
 st.set_page_config(   
     page_icon="📌",
@@ -40,32 +43,41 @@ def load_data():
         'Puntuación': [8.8, 7.8, 8.7, 8.0, 8.6]
     })
 
+@st.cache_resource
+def indice_anios():
+    # El año no se edita en la sesión, así que el índice sobre la tabla base sirve siempre.
+    return IndiceRango(load_data(), ['Año'])
+
 df = load_data()
 
+# La tabla en caché no se modifica: los cambios de esta sesión se guardan
+# aparte y se superponen sólo sobre lo que se muestra.
+cambios = ediciones("peliculas")
+
 st.title("🎬 Explorador de Películas con .loc y .iloc")
 
 # --- Ver DataFrame completo ---
 if st.checkbox("Mostrar todos los datos"):
-    st.dataframe(df)
+    st.dataframe(cambios.vista(df))
 
 # --- Selección de fila por índice usando iloc ---
 st.subheader("🔢 Seleccionar una fila con .iloc")
 row_idx = st.number_input("Índice de fila (0 a {})".format(len(df)-1), min_value=0, max_value=len(df)-1, step=1)
 st.write("Fila seleccionada:")
-st.write(df.iloc[row_idx])
+st.write(cambios.fila(df, row_idx))
 
 # --- Selección de columnas por nombre con .loc ---
 st.subheader("📌 Seleccionar columnas específicas con .loc")
 selected_columns = st.multiselect("Selecciona las columnas a mostrar", df.columns.tolist(), default=df.columns.tolist())
-st.write(df.loc[:, selected_columns])
+st.write(cambios.vista(df.loc[:, selected_columns]))
 
 # --- Filtro personalizado con .loc ---
 st.subheader("🔍 Filtrar películas por año con .loc")
 year_min = st.slider("Año mínimo", min_value=df['Año'].min(), max_value=df['Año'].max(), value=df['Año'].min())
 year_max = st.slider("Año máximo", min_value=year_min, max_value=df['Año'].max(), value=df['Año'].max())
-filtered_df = df.loc[(df['Año'] >= year_min) & (df['Año'] <= year_max)]
+filtered_df = df.iloc[indice_anios().filas('Año', year_min, year_max)]
 st.write(f"Películas entre {year_min} y {year_max}:")
-st.dataframe(filtered_df)
+st.dataframe(cambios.vista(filtered_df))
 
 # --- Modificar un valor con .loc ---
 st.subheader("✏️ Modificar puntuación de una película")
@@ -74,6 +86,28 @@ new_score = st.slider("Nueva puntuación", 0.0, 10.0, 5.0, step=0.1)
 
 if st.button("Actualizar puntuación"):
     idx = df.loc[df['Título'] == movie_to_edit].index[0]
-    df.loc[idx, 'Puntuación'] = new_score
+    cambios.editar(idx, 'Puntuación', new_score)
     st.success(f"Puntuación de '{movie_to_edit}' actualizada a {new_score}")
-    st.dataframe(df)
\ No newline at end of file
+    st.dataframe(cambios.vista(df))
+
+# --- Edición por lotes con st.data_editor ---
+st.subheader("🗂️ Editar varias puntuaciones a la vez")
+vista_actual = cambios.vista(df)
+# La llave cambia con cada lote guardado o deshecho para reiniciar el editor.
+editado = st.data_editor(
+    vista_actual,
+    disabled=[c for c in df.columns if c != 'Puntuación'],
+    key=f"editor_peliculas_{cambios.version}",
+)
+ecol1, ecol2 = st.columns(2)
+with ecol1:
+    if st.button("💾 Guardar cambios"):
+        guardados = cambios.confirmar(Ediciones.diferencias(vista_actual, editado, ['Puntuación']))
+        if guardados:
+            st.rerun()
+        st.info("No hay cambios para guardar.")
+with ecol2:
+    if st.button("↩️ Deshacer último cambio", disabled=not cambios.lotes):
+        cambios.deshacer()
+        st.rerun()
+st.caption(f"{len(cambios)} celdas editadas en {cambios.lotes} cambios guardados en esta sesión.")
\ No newline at end of file
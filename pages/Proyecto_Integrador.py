@@ -1,14 +1,33 @@
-from PIL import Image
 import streamlit as st
 from google import genai
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
+from functools import partial
 import requests
 import json
-import matplotlib.pyplot as plt
+import uuid
 import google.generativeai as genai
 
+from utils.cache_respuestas import CacheRespuestas, cache_respuestas
+from utils.cliente_http import cliente_http
+from utils.cola_llm import EN_COLA, ERROR, LISTO, VENCIDO, ColaLlena, cola_llm
+from utils.contexto_llm import PRESUPUESTO_TOKENS, construir_contexto
+from utils.exportar import boton_descarga
+from utils.figuras import almacen_figuras
+from utils.llm import identificador_modelo, obtener_modelo
+from utils.miniaturas import miniaturas
+from utils.tabla import posiciones_visibles, tabla_paginada
+from utils.trata import (
+    RUTA_TRATA,
+    cargar_trata,
+    cubo_trata,
+    indice_trata,
+    orden_fecha_trata,
+    reporte_validacion_trata,
+    tokens_tabla_trata,
+)
+
 # ✅ Configuración de la página (esto debe ir al principio)
 st.set_page_config(
     page_title="Poryecto Integrador",
@@ -43,16 +62,49 @@ st.markdown("""
 st.header("Solución")
 
 # --- Cargar y limpiar datos ---
-df = pd.read_csv("./pages/trata_de_personas.csv")
-df.columns = df.columns.str.strip().str.upper()
-df['FECHA HECHO'] = pd.to_datetime(df['FECHA HECHO'], errors='coerce')
-df['AÑO'] = df['FECHA HECHO'].dt.year
+# La instantánea Arrow se comparte entre sesiones y secciones (sólo lectura).
+df_trata, version_trata = cargar_trata()
+df = df_trata
+cubo = cubo_trata(version_trata, df_trata)
+indice = indice_trata(version_trata, df_trata)
+orden_fecha = orden_fecha_trata(version_trata, df_trata)
+
+
+def dibujar_torta_departamentos(cubo, anio, fig):
+    """Gráfico circular de los 5 departamentos con más casos en `anio` y OTROS."""
+    casos_por_departamento = (
+        cubo.filtrar({'AÑO': [anio]}).por('DEPARTAMENTO')
+        .set_index('DEPARTAMENTO')['CANTIDAD']
+        .sort_values(ascending=False)
+    )
+    top_5 = casos_por_departamento.head(5)
+    otros = pd.Series([casos_por_departamento[5:].sum()], index=["OTROS"])
+    casos_final = pd.concat([top_5, otros])
+
+    ax = fig.subplots()
+    ax.pie(casos_final, labels=casos_final.index, autopct='%1.1f%%', startangle=90)
+    ax.axis('equal')
+
+
+# Los gráficos por año de la sección de visualización se dibujan en segundo
+# plano mientras se muestra el resto de la página.
+figuras = almacen_figuras()
+figuras.prerenderizar(
+    (("torta_departamentos", version_trata, anio), partial(dibujar_torta_departamentos, cubo, anio))
+    for anio in indice.valores['AÑO']
+)
+
+reporte = reporte_validacion_trata()
+if reporte and reporte["errores"]:
+    with st.expander("⚠️ Validación de datos: valores que no se pudieron convertir"):
+        st.write(reporte["errores"])
+        st.dataframe(pd.DataFrame(reporte["muestras"]), use_container_width=True)
 
 # --- KPIs ---
 st.title("📊 Dashboard: Casos de Trata de Personas en Colombia")
-total_casos = int(df['CANTIDAD'].sum())
-total_departamentos = df['DEPARTAMENTO'].nunique()
-total_municipios = df['MUNICIPIO'].nunique()
+total_casos = int(cubo.total())
+total_departamentos = cubo.distintos('DEPARTAMENTO')
+total_municipios = cubo.distintos('MUNICIPIO')
 
 col1, col2, col3 = st.columns(3)
 col1.metric("Total de Casos", f"{total_casos}")
@@ -66,32 +118,42 @@ fcol1, fcol2 = st.columns(2)
 with fcol1:
     años = st.multiselect(
         "Selecciona Años", 
-        options=sorted(df['AÑO'].dropna().unique()), 
-        default=sorted(df['AÑO'].dropna().unique())
+        options=indice.valores['AÑO'], 
+        default=indice.valores['AÑO']
     )
 
 with fcol2:
     deptos = st.multiselect(
         "Selecciona Departamentos", 
-        options=sorted(df['DEPARTAMENTO'].dropna().unique()), 
-        default=sorted(df['DEPARTAMENTO'].dropna().unique())
+        options=indice.valores['DEPARTAMENTO'], 
+        default=indice.valores['DEPARTAMENTO']
     )
 
-df_filtrado = df[df['AÑO'].isin(años) & df['DEPARTAMENTO'].isin(deptos)]
+filas_filtradas = indice.filas({'AÑO': años, 'DEPARTAMENTO': deptos})
+cubo_filtrado = cubo.filtrar({'AÑO': años, 'DEPARTAMENTO': deptos})
 
 # --- Gráficos ---
 st.subheader("Casos por Año")
-casos_anuales = df_filtrado.groupby('AÑO')['CANTIDAD'].sum().reset_index()
+casos_anuales = cubo_filtrado.por('AÑO')
 fig1 = px.bar(casos_anuales, x='AÑO', y='CANTIDAD', labels={'CANTIDAD': 'Cantidad de Casos'})
 st.plotly_chart(fig1)
 
 st.subheader("Casos por Departamento")
-casos_departamento = df_filtrado.groupby('DEPARTAMENTO')['CANTIDAD'].sum().reset_index().sort_values(by='CANTIDAD', ascending=False)
+casos_departamento = cubo_filtrado.por('DEPARTAMENTO').sort_values(by='CANTIDAD', ascending=False)
 fig2 = px.bar(casos_departamento, x='CANTIDAD', y='DEPARTAMENTO', orientation='h', labels={'CANTIDAD': 'Cantidad de Casos'})
 st.plotly_chart(fig2)
 
 st.subheader("Datos Filtrados")
-st.dataframe(df_filtrado.sort_values(by='FECHA HECHO', ascending=False))
+tabla_paginada(df, orden=orden_fecha, filas=filas_filtradas, clave="trata_filtrada")
+boton_descarga(
+    df,
+    "trata_filtrada",
+    clave="trata_filtrada",
+    huella=f"trata-{version_trata}",
+    # Las posiciones en el orden de la tabla se calculan sólo al pedir la descarga.
+    filas=lambda: posiciones_visibles(len(df), orden_fecha, filas_filtradas),
+    etiqueta="📥 Descargar datos filtrados",
+)
 
 # -----------------------------
 # 🧩 Parte 2: API REST - Usuarios
@@ -125,23 +187,45 @@ st.title("📊 Consulta de usuarios desde API en la nube")
 url = "https://api-b56e.onrender.com/users"
 
 try:
-    response = requests.get(url)
-    response.raise_for_status()
-    data = response.json()
-
-    if data:
-        df = pd.json_normalize(data)
-        st.subheader("✅ Todos los usuarios recibidos:")
-        st.dataframe(df, use_container_width=True)
-
-        csv = df.to_csv(index=False, encoding='utf-8-sig')
-        st.download_button(
-            label="📥 Descargar todos los datos como CSV",
-            data=csv,
-            file_name='usuarios_api.csv',
-            mime='text/csv'
+    # Cliente compartido: pool de conexiones, timeouts, reintentos y caché.
+    # Las páginas se piden en paralelo y cada una se agrega a la tabla apenas
+    # se normaliza, sin esperar a que termine la descarga completa.
+    encabezado_api = st.empty()
+    tabla_usuarios = st.empty()
+    progreso_api = st.empty()
+    recibidos = {"filas": 0, "tabla": None}
+
+    def mostrar_lote(lote):
+        if recibidos["tabla"] is None:
+            encabezado_api.subheader("✅ Todos los usuarios recibidos:")
+            recibidos["columnas"] = list(lote.columns)
+            recibidos["tabla"] = tabla_usuarios.dataframe(lote, use_container_width=True)
+        else:
+            recibidos["tabla"].add_rows(lote.reindex(columns=recibidos["columnas"]))
+        recibidos["filas"] += len(lote)
+        progreso_api.caption(f"Descargando… {recibidos['filas']} usuarios recibidos")
+
+    df, info_api = cliente_http().tabla_paginada(url, al_lote=mostrar_lote)
+    progreso_api.empty()
+    if info_api["origen"] == "obsoleto":
+        st.warning(
+            f"⚠️ La API no respondió ({info_api['error']}). "
+            f"Se muestran los datos obtenidos hace {info_api['edad']:.0f} s."
+        )
+
+    if not df.empty:
+        # Si la tabla salió de la caché no hubo lotes: se muestra completa.
+        encabezado_api.subheader("✅ Todos los usuarios recibidos:")
+        if recibidos["tabla"] is None or list(df.columns) != recibidos["columnas"]:
+            tabla_usuarios.dataframe(df, use_container_width=True)
+
+        # El archivo se genera sólo cuando se pide y se reutiliza por la versión de la respuesta.
+        boton_descarga(
+            df, "usuarios_api", clave="usuarios_api",
+            huella=info_api["version"], etiqueta="📥 Descargar todos los datos",
         )
     else:
+        tabla_usuarios.empty()
         st.warning("⚠️ La respuesta JSON está vacía.")
 
 except requests.exceptions.RequestException as e:
@@ -153,36 +237,21 @@ except Exception as e:
 
 st.title("📊 Visualización de Casos de Trata de Personas por Departamento")
 
-# Cargar CSV con columnas en mayúscula
-try:
-    df = pd.read_csv("./pages/trata_de_personas.csv")
-    df['FECHA HECHO'] = pd.to_datetime(df['FECHA HECHO'], errors='coerce')
-    df['CANTIDAD'] = pd.to_numeric(df['CANTIDAD'], errors='coerce').fillna(0).astype(int)
-    df['DEPARTAMENTO'] = df['DEPARTAMENTO'].astype(str).str.upper()
-except Exception as e:
-    st.error(f"❌ Error al cargar los datos: {e}")
-    st.stop()
+# Reutilizar el dataset ya cargado (columnas en mayúscula y fechas parseadas)
+df = df_trata
 
 # Filtrado dinámico por año
-anios_disponibles = sorted(df['FECHA HECHO'].dt.year.dropna().unique())
+anios_disponibles = indice.valores['AÑO']
 anio_seleccionado = st.selectbox("📅 Selecciona un año", anios_disponibles)
 
-df_filtrado = df[df['FECHA HECHO'].dt.year == anio_seleccionado]
-
-# Agrupación por departamento
-casos_por_departamento = df_filtrado.groupby("DEPARTAMENTO")["CANTIDAD"].sum().sort_values(ascending=False)
-
-# Mostrar gráfico circular con los 5 principales
-top_5 = casos_por_departamento.head(5)
-otros = pd.Series([casos_por_departamento[5:].sum()], index=["OTROS"])
-casos_final = pd.concat([top_5, otros])
-
-fig, ax = plt.subplots()
-ax.pie(casos_final, labels=casos_final.index, autopct='%1.1f%%', startangle=90)
-ax.axis('equal')
+# Gráfico circular con los 5 principales, ya renderizado por (versión, año)
+torta = figuras.obtener(
+    ("torta_departamentos", version_trata, anio_seleccionado),
+    partial(dibujar_torta_departamentos, cubo, anio_seleccionado),
+)
 
 st.subheader(f"🧩 Distribución de casos por departamento en {anio_seleccionado}")
-st.pyplot(fig)
+st.image(torta, use_container_width=True)
     
 # -----------------------------
 # 🧩 Parte 3: API DE GEMINI AI  
@@ -215,55 +284,141 @@ st.markdown("Pregunta sobre los datos de un CSV cargado desde una URL predefinid
 
 # --- Parte 1: Definir la URL del CSV internamente ---
 # Reemplaza esta URL con la de tu propio archivo CSV
-csv_url_fija = "./pages/trata_de_personas.csv" # Ejemplo de un CSV público
+csv_url_fija = RUTA_TRATA # Ejemplo de un CSV público
 
 df = None # Inicializa df
 st.subheader("1. Cargando CSV desde URL fija...")
 try:
-    df = pd.read_csv(csv_url_fija)
+    df = df_trata
     st.success(f"CSV cargado exitosamente desde: {csv_url_fija}")
     st.write("Información del archivo:")
-    st.dataframe(df)
+    tabla_paginada(df, clave="trata_gemini")
 except Exception as e:
     st.error(f"Error al cargar el CSV desde la URL fija: {e}. Asegúrate de que la URL es correcta y el archivo es accesible.")
     df = pd.DataFrame() # Asegurarse de que df esté definido
 # --- Parte 2: Interacción con Gemini ---
 st.subheader("2. Haz tu pregunta a Gemini")
 prompt_usuario = st.text_input("Escribe tu pregunta o tema:", placeholder="Ej. ¿Que casos hubieron en 2008?")
+presupuesto_tokens = st.slider("Presupuesto de tokens para el contexto", 500, 30000, PRESUPUESTO_TOKENS, step=500)
+transmitir = st.checkbox("Mostrar la respuesta mientras se genera", value=True)
 enviar = st.button("Generar Respuesta")
 
-# Función para interactuar con Gemini (la misma que antes)
-def generar_respuesta_con_contexto(prompt_usuario, dataframe):
-    if not prompt_usuario:
-        return "Por favor, ingresa un tema o pregunta."
+MODELO_GEMINI = 'gemini-1.5-flash'
 
+# Construye el prompt con sólo el contexto relevante a la pregunta
+def construir_prompt(prompt_usuario, dataframe):
+    contexto = None
     contexto_csv = ""
     if not dataframe.empty:
-        contexto_csv = "A continuación, se presenta un fragmento de un archivo CSV:\n\n"
-        contexto_csv += dataframe.to_markdown(index=False)
+        contexto = construir_contexto(
+            prompt_usuario, dataframe, indice, cubo,
+            orden=orden_fecha,
+            presupuesto_tokens=presupuesto_tokens,
+            tokens_completos=tokens_tabla_trata(version_trata, dataframe),
+        )
+        contexto_csv = "A continuación, se presenta un resumen y un fragmento de un archivo CSV:\n\n"
+        contexto_csv += contexto["texto"]
         contexto_csv += "\n\nBasándote en esta información y en tus conocimientos, responde a la siguiente pregunta:"
 
-    full_prompt = f"{contexto_csv}\n\nPregunta: {prompt_usuario}"
+    return f"{contexto_csv}\n\nPregunta: {prompt_usuario}", contexto
 
-    try:
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(full_prompt)
-        return response.text
-    except Exception as e:
-        return f"Error al comunicarse con Gemini: {str(e)}"
+def mostrar_contexto(contexto):
+    if contexto:
+        st.caption(
+            f"Contexto: {contexto['tokens']} tokens estimados, "
+            f"{contexto['filas_incluidas']} de {contexto['filas_relevantes']} filas relevantes · "
+            f"ahorro frente a la tabla completa: {contexto['tokens_ahorrados']} tokens"
+        )
+
+# Muestra el estado de la pregunta en la cola; mientras espera se vuelve a
+# ejecutar sola, sin ocupar el hilo de la sesión. Con `transmitir` se
+# muestra el texto que ya llegó.
+def mostrar_trabajo(trabajo, sondeando, transmitir):
+    if not trabajo.terminado:
+        if trabajo.estado == EN_COLA:
+            st.info(f"⏳ Pregunta en cola (posición {cola.posicion(trabajo) + 1}).")
+        elif transmitir and trabajo.texto:
+            st.markdown(trabajo.texto + " ▌")
+        else:
+            st.info("✍️ Generando respuesta...")
+        if st.button("Cancelar", key="cancelar_llm"):
+            cola.soltar(trabajo, id_sesion)
+            st.rerun()
+        return
+    if sondeando:
+        # Terminó mientras se consultaba: se vuelve a ejecutar la página
+        # para dejar de sondear.
+        st.rerun()
+    if trabajo.estado == LISTO:
+        st.markdown(trabajo.texto)
+        mostrar_contexto(st.session_state.get("contexto_llm"))
+        if trabajo.metricas.get("primer_token") is not None:
+            st.caption(
+                f"Primer fragmento en {trabajo.metricas['primer_token']:.2f} s · "
+                f"respuesta completa en {trabajo.metricas['total']:.2f} s"
+            )
+    elif trabajo.estado == ERROR:
+        st.error(f"Error al comunicarse con Gemini: {trabajo.error}")
+    elif trabajo.estado == VENCIDO:
+        st.warning("Gemini tardó demasiado en responder. Intenta de nuevo.")
+    else:
+        st.info("Pregunta cancelada.")
+
+cola = cola_llm()
+cache = cache_respuestas()
+# Identifica a esta sesión entre quienes esperan un trabajo de la cola.
+id_sesion = st.session_state.setdefault("id_sesion", uuid.uuid4().hex)
 
 # Lógica principal
 if enviar and prompt_usuario:
     if not df.empty:
-        with st.spinner("Generando respuesta..."):
-            respuesta = generar_respuesta_con_contexto(prompt_usuario, df)
-            st.subheader("Respuesta de Gemini:")
-            st.markdown(respuesta)
+        # Misma pregunta, mismos datos y mismo modelo: se reutiliza la respuesta.
+        clave = CacheRespuestas.clave(prompt_usuario, version_trata, identificador_modelo(MODELO_GEMINI), presupuesto_tokens)
+        anterior = cola.obtener(st.session_state.pop("trabajo_llm", None))
+        st.session_state.pop("respuesta_llm", None)
+        guardada = cache.obtener(clave)
+        trabajo = None
+        if guardada is not None:
+            st.session_state["respuesta_llm"] = guardada
+        else:
+            full_prompt, contexto = construir_prompt(prompt_usuario, df)
+            try:
+                trabajo = cola.enviar(
+                    clave, obtener_modelo(MODELO_GEMINI), full_prompt,
+                    al_terminar=lambda texto, clave=clave: cache.guardar(clave, texto),
+                    sesion=id_sesion,
+                )
+                st.session_state["trabajo_llm"] = trabajo.id
+                st.session_state["contexto_llm"] = contexto
+            except ColaLlena as e:
+                st.warning(str(e))
+        if anterior is not None and anterior is not trabajo:
+            cola.soltar(anterior, id_sesion)
     else:
         st.warning("No se pudo cargar el CSV desde la URL fija.")
+
+trabajo = cola.obtener(st.session_state.get("trabajo_llm"))
+if trabajo is not None:
+    st.subheader("Respuesta de Gemini:")
+    # Si el usuario vuelve a ejecutar la página, el trabajo sigue en la cola
+    # y se retoma; al transmitir se consulta más seguido.
+    sondear = not trabajo.terminado
+    intervalo = (0.5 if transmitir else 1) if sondear else None
+    st.fragment(mostrar_trabajo, run_every=intervalo)(trabajo, sondear, transmitir)
+elif "respuesta_llm" in st.session_state:
+    st.subheader("Respuesta de Gemini:")
+    st.markdown(st.session_state["respuesta_llm"])
+    st.caption("Respuesta obtenida de la caché.")
 else:
     st.info("Escribe un tema o pregunta y haz clic en Generar Respuesta.")
 
+estadisticas = cache.estadisticas()
+st.caption(
+    f"Caché de respuestas: {estadisticas['aciertos']} aciertos, "
+    f"{estadisticas['fallos']} fallos, {estadisticas['entradas']} entradas · "
+    f"cola: {cola.pendientes()} pendientes, {cola.contadores['deduplicados']} preguntas repetidas unidas"
+)
+
 st.title("Integrantes: ")
 
 # Definir el alto deseado para todas las imágenes
@@ -280,10 +435,9 @@ datos_estudiantes = [
 
 cols = st.columns(len(datos_estudiantes))
 
-for col, (ruta, nombre) in zip(cols, datos_estudiantes):
+# Miniaturas en caché (disco y memoria): sólo se redimensionan si cambia la foto.
+fotos = miniaturas([ruta for ruta, _ in datos_estudiantes], alto=ALTO_DESEADO)
+
+for col, foto, (ruta, nombre) in zip(cols, fotos, datos_estudiantes):
     with col:
-        img = Image.open(ruta)
-        w, h = img.size
-        nuevo_ancho = int(w * (ALTO_DESEADO / h))
-        img_resized = img.resize((nuevo_ancho, ALTO_DESEADO), Image.LANCZOS)
-        st.image(img_resized, caption=nombre)
+        st.image(foto, caption=nombre)
@@ -0,0 +1,51 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from utils.cliente_http import ClienteHTTP
+
+TAMANO = 5
+
+
+class _Lento(BaseHTTPRequestHandler):
+    """La primera página responde al instante; las demás tardan 5 s."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        offset = int(parse_qs(urlparse(self.path).query).get("offset", ["0"])[0])
+        if offset:
+            time.sleep(5)
+        cuerpo = json.dumps([{"id": offset + i} for i in range(TAMANO)]).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+        except OSError:
+            pass
+
+
+@pytest.fixture
+def servidor_lento():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Lento)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_port}/"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_tiempo_maximo_no_espera_paginas_en_vuelo(servidor_lento):
+    cliente = ClienteHTTP(ttl=0, timeout=(1, 8), reintentos=0, tiempo_maximo=2)
+    inicio = time.monotonic()
+    with pytest.raises(requests.Timeout, match="superó 2 s"):
+        cliente.tabla_paginada(servidor_lento, tamano=TAMANO)
+    assert time.monotonic() - inicio < 3
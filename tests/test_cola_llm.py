@@ -0,0 +1,22 @@
+import time
+
+from utils.cola_llm import LISTO, VENCIDO, ColaLLM
+from utils.llm import ModeloLocal
+
+
+def _esperar(trabajo, segundos):
+    limite = time.monotonic() + segundos
+    while not trabajo.terminado and time.monotonic() < limite:
+        time.sleep(0.05)
+    return trabajo.estado
+
+
+def test_trabajo_vencido_libera_al_trabajador():
+    cola = ColaLLM(trabajadores=1, timeout=1.0)
+    colgado = cola.enviar("colgado", ModeloLocal(retardo=3), "Pregunta: uno")
+    time.sleep(0.6)
+    # Entra a la cola detrás del trabajo que va a vencer; su plazo termina a los 1.6 s.
+    siguiente = cola.enviar("siguiente", ModeloLocal(), "Pregunta: dos")
+    assert _esperar(siguiente, 2) == LISTO
+    assert colgado.estado == VENCIDO
+    assert "dos" in siguiente.texto
@@ -0,0 +1 @@
+"""Utilidades compartidas por las páginas de la aplicación."""
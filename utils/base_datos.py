@@ -0,0 +1,137 @@
+"""Acceso a bases SQLite compartido por el proceso.
+
+`BaseDatos` mantiene un pequeño pool de conexiones en modo WAL (los
+lectores no bloquean al escritor), aplica migraciones numeradas con
+`PRAGMA user_version` y guarda en memoria el resultado de las consultas de
+lectura. La caché se invalida cuando cambia `PRAGMA data_version`, que
+SQLite incrementa cuando otra conexión (de este u otro proceso) confirma
+cambios, o cuando se escribe a través de `ejecutar`.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+
+class BaseDatos:
+    def __init__(self, ruta, migraciones=(), conexiones=4):
+        self.ruta = str(ruta)
+        self._pool = queue.LifoQueue()
+        self._creadas = 0
+        self._max_conexiones = conexiones
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._escrituras = 0
+        # Conexión dedicada a leer `data_version`: nunca escribe, así que ve
+        # los cambios confirmados por todas las demás.
+        self._vigia = self._abrir()
+        self._migrar(migraciones)
+
+    def _abrir(self):
+        # Autocommit: las transacciones se abren explícitamente con BEGIN.
+        conn = sqlite3.connect(self.ruta, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def conexion(self):
+        """Presta una conexión del pool (se crea si todavía hay cupo)."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                crear = self._creadas < self._max_conexiones
+                if crear:
+                    self._creadas += 1
+            conn = self._abrir() if crear else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaccion(self):
+        """Conexión con una transacción de escritura (BEGIN IMMEDIATE ... COMMIT)."""
+        with self.conexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        with self._lock:
+            self._escrituras += 1
+
+    def _migrar(self, migraciones):
+        # Cada migración es una función `migracion(conn)`; `user_version`
+        # guarda cuántas se aplicaron. Se vuelve a leer dentro de la
+        # transacción por si otro proceso migró al mismo tiempo.
+        with self.transaccion() as conn:
+            aplicadas = conn.execute("PRAGMA user_version").fetchone()[0]
+            for numero, migracion in enumerate(migraciones[aplicadas:], start=aplicadas + 1):
+                migracion(conn)
+                conn.execute(f"PRAGMA user_version = {numero}")
+
+    def _version(self):
+        with self._lock:
+            return self._vigia.execute("PRAGMA data_version").fetchone()[0], self._escrituras
+
+    def consultar(self, sql, params=()):
+        """DataFrame con el resultado de `sql`, en caché mientras los datos no cambien.
+
+        El DataFrame se comparte entre sesiones: no modificarlo.
+        """
+        llave = (sql, tuple(params))
+        version = self._version()
+        with self._lock:
+            entrada = self._cache.get(llave)
+        if entrada is not None and entrada[0] == version:
+            return entrada[1]
+        with self.conexion() as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        with self._lock:
+            self._cache[llave] = (version, df)
+        return df
+
+    def ejecutar(self, sql, params=()):
+        """Ejecuta una sentencia de escritura en su propia transacción."""
+        with self.transaccion() as conn:
+            return conn.execute(sql, params).rowcount
+
+
+# --- Base de alumnos de la Actividad 1 del Momento 2 ---
+
+RUTA_ALUMNOS = "estudiantes.db"
+ALUMNOS_INICIALES = [("Pedro", 85), ("Lucía", 90), ("Andrés", 78)]
+
+
+def _crear_alumnos(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS alumnos (nombre TEXT, calificación INTEGER)")
+
+
+def _deduplicar_alumnos(conn):
+    # Versiones anteriores de la página insertaban los mismos tres alumnos
+    # en cada visita: se conserva la primera copia de cada fila.
+    conn.execute(
+        "DELETE FROM alumnos WHERE rowid NOT IN "
+        "(SELECT MIN(rowid) FROM alumnos GROUP BY nombre, calificación)"
+    )
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS alumnos_fila ON alumnos (nombre, calificación)")
+
+
+def _sembrar_alumnos(conn):
+    conn.executemany("INSERT OR IGNORE INTO alumnos VALUES (?, ?)", ALUMNOS_INICIALES)
+
+
+MIGRACIONES_ALUMNOS = (_crear_alumnos, _deduplicar_alumnos, _sembrar_alumnos)
+
+
+@st.cache_resource(show_spinner=False)
+def base_alumnos():
+    """Base de alumnos migrada y con los datos iniciales (una por proceso)."""
+    return BaseDatos(RUTA_ALUMNOS, MIGRACIONES_ALUMNOS)
@@ -0,0 +1,96 @@
+"""Caché persistente de respuestas del modelo.
+
+Las respuestas se guardan en un archivo SQLite, de modo que se comparten
+entre sesiones, procesos y reinicios del servidor. La llave combina la
+pregunta normalizada, la versión del dataset, el modelo y cualquier otro
+parámetro que cambie el prompt. Las entradas vencen después de `ttl`
+segundos y, al superar `max_entradas`, se descartan las usadas hace más
+tiempo (LRU).
+"""
+import hashlib
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import streamlit as st
+
+from utils.contexto_llm import normalizar
+
+RUTA_CACHE = Path(".cache") / "respuestas.db"
+
+
+class CacheRespuestas:
+    def __init__(self, ruta=RUTA_CACHE, max_entradas=1000, ttl=7 * 24 * 3600):
+        self.ruta = Path(ruta)
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS respuestas ("
+                "clave TEXT PRIMARY KEY, respuesta TEXT NOT NULL, "
+                "creado REAL NOT NULL, usado REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS respuestas_usado ON respuestas (usado)")
+            conn.execute("CREATE TABLE IF NOT EXISTS contadores (nombre TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO contadores VALUES (?, 0)", [("aciertos",), ("fallos",)]
+            )
+
+    @contextmanager
+    def _conectar(self):
+        # Una conexión por operación: es barato y evita compartirlas entre hilos.
+        conn = sqlite3.connect(self.ruta, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def clave(pregunta, version, modelo, *extra):
+        partes = [normalizar(pregunta), version, modelo, *map(str, extra)]
+        return hashlib.sha256("\0".join(partes).encode("utf-8")).hexdigest()
+
+    def obtener(self, clave):
+        """Devuelve la respuesta guardada o None, y actualiza los contadores."""
+        ahora = time.time()
+        with self._conectar() as conn:
+            fila = conn.execute(
+                "SELECT respuesta, creado FROM respuestas WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is not None and ahora - fila[1] > self.ttl:
+                conn.execute("DELETE FROM respuestas WHERE clave = ?", (clave,))
+                fila = None
+            if fila is None:
+                conn.execute("UPDATE contadores SET valor = valor + 1 WHERE nombre = 'fallos'")
+                return None
+            conn.execute("UPDATE respuestas SET usado = ? WHERE clave = ?", (ahora, clave))
+            conn.execute("UPDATE contadores SET valor = valor + 1 WHERE nombre = 'aciertos'")
+            return fila[0]
+
+    def guardar(self, clave, respuesta):
+        ahora = time.time()
+        with self._conectar() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO respuestas VALUES (?, ?, ?, ?)", (clave, respuesta, ahora, ahora)
+            )
+            conn.execute(
+                "DELETE FROM respuestas WHERE clave IN ("
+                "SELECT clave FROM respuestas ORDER BY usado DESC LIMIT -1 OFFSET ?)",
+                (self.max_entradas,),
+            )
+
+    def estadisticas(self):
+        """Devuelve {"aciertos", "fallos", "entradas"}."""
+        with self._conectar() as conn:
+            datos = dict(conn.execute("SELECT nombre, valor FROM contadores").fetchall())
+            datos["entradas"] = conn.execute("SELECT COUNT(*) FROM respuestas").fetchone()[0]
+        return datos
+
+
+@st.cache_resource(show_spinner=False)
+def cache_respuestas():
+    """Instancia compartida por todas las sesiones del proceso."""
+    return CacheRespuestas()
@@ -0,0 +1,98 @@
+"""Carga concurrente de varias fuentes de datos.
+
+Todas las fuentes se cargan a la vez en un grupo de hilos y cada una se
+entrega apenas termina, para que la página la muestre sin esperar a las
+demás. Cada fuente tiene su propio tiempo máximo y, opcionalmente, un
+respaldo (por ejemplo, una copia local de un archivo remoto) que se usa si
+falla o no responde a tiempo. Los errores quedan aislados en el resultado
+de su fuente.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+OK = "ok"
+ERROR = "error"
+AGOTADO = "tiempo agotado"
+RESPALDO = "respaldo"
+
+
+class Fuente:
+    def __init__(self, nombre, cargar, timeout=10.0, respaldo=None):
+        self.nombre = nombre
+        self.cargar = cargar
+        self.timeout = timeout
+        self.respaldo = respaldo
+
+
+class Resultado:
+    def __init__(self, fuente, estado, datos=None, error=None, segundos=0.0):
+        self.nombre = fuente.nombre
+        self.estado = estado
+        self.datos = datos
+        self.error = error
+        self.segundos = segundos
+
+    def fila(self):
+        """Fila para la tabla de tiempos."""
+        return {
+            "fuente": self.nombre,
+            "estado": self.estado,
+            "segundos": round(self.segundos, 3),
+            "filas": None if self.datos is None else len(self.datos),
+            "error": None if self.error is None else str(self.error),
+        }
+
+
+def _medir(cargar):
+    inicio = time.perf_counter()
+    datos = cargar()
+    return datos, time.perf_counter() - inicio
+
+
+def _con_respaldo(fuente, estado, error, segundos):
+    if fuente.respaldo is None:
+        return Resultado(fuente, estado, error=error, segundos=segundos)
+    try:
+        datos, extra = _medir(fuente.respaldo)
+    except Exception as e:
+        return Resultado(fuente, estado, error=e, segundos=segundos)
+    return Resultado(fuente, RESPALDO, datos=datos, error=error, segundos=segundos + extra)
+
+
+def cargar_fuentes(fuentes, al_resolver):
+    """Carga `fuentes` en paralelo y llama a `al_resolver(resultado)` por cada una.
+
+    `al_resolver` se llama en el hilo que invoca esta función (el de la
+    página), en el orden en que las fuentes terminan. Una fuente que supera
+    su `timeout` se da por agotada y su hilo se abandona. Devuelve la lista
+    de resultados.
+    """
+    ejecutor = ThreadPoolExecutor(max_workers=max(1, len(fuentes)), thread_name_prefix="fuente")
+    inicio = time.perf_counter()
+    pendientes = {ejecutor.submit(_medir, f.cargar): f for f in fuentes}
+    resultados = []
+    try:
+        while pendientes:
+            limite = min(inicio + f.timeout for f in pendientes.values())
+            listos, _ = wait(pendientes, timeout=max(0.0, limite - time.perf_counter()), return_when=FIRST_COMPLETED)
+            ahora = time.perf_counter()
+            for futuro, fuente in list(pendientes.items()):
+                if futuro in listos:
+                    error = futuro.exception()
+                    if error is None:
+                        datos, segundos = futuro.result()
+                        resultado = Resultado(fuente, OK, datos=datos, segundos=segundos)
+                    else:
+                        resultado = _con_respaldo(fuente, ERROR, error, ahora - inicio)
+                elif ahora >= inicio + fuente.timeout:
+                    error = TimeoutError(f"sin respuesta después de {fuente.timeout:g} s")
+                    resultado = _con_respaldo(fuente, AGOTADO, error, ahora - inicio)
+                else:
+                    continue
+                del pendientes[futuro]
+                resultados.append(resultado)
+                al_resolver(resultado)
+    finally:
+        # No se espera a los hilos agotados: terminan por su cuenta.
+        ejecutor.shutdown(wait=False, cancel_futures=True)
+    return resultados
@@ -0,0 +1,220 @@
+"""Cliente HTTP compartido para consumir APIs desde las páginas.
+
+Usa una sola `requests.Session` con un pool de conexiones, tiempos máximos
+de conexión y lectura, y reintentos con espera exponencial (no se reintenta
+una lectura que agotó su tiempo). `tabla_paginada` guarda cada colección en
+memoria durante `ttl` segundos; al vencer la revalida con
+`If-None-Match`/`If-Modified-Since` y, si la API falla, devuelve los
+últimos datos conocidos marcados como obsoletos. Un fallo se recuerda
+`ttl_fallo` segundos: mientras tanto los reruns no vuelven a la red.
+
+Las colecciones de varias páginas se descargan en paralelo y cada página
+se normaliza a un DataFrame apenas llega, de modo que en memoria sólo
+conviven unas pocas páginas como objetos JSON.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TiempoAgotado
+
+import pandas as pd
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (conexión, lectura) en segundos.
+TIMEOUT = (3.05, 10)
+# Tiempo máximo para todas las páginas de una colección.
+TIEMPO_MAXIMO = 30
+
+
+def parametros_offset(pagina, tamano):
+    """Parámetros de paginación estilo `offset`/`limit`."""
+    return {"offset": pagina * tamano, "limit": tamano}
+
+
+def _info(origen, entrada, edad=0.0, error=None):
+    return {"origen": origen, "edad": edad, "error": None if error is None else str(error), "version": entrada["version"]}
+
+
+class ClienteHTTP:
+    def __init__(self, ttl=60, timeout=TIMEOUT, reintentos=2, backoff=0.5, conexiones=10,
+                 ttl_fallo=30, tiempo_maximo=TIEMPO_MAXIMO):
+        self.ttl = ttl
+        self.ttl_fallo = ttl_fallo
+        self.timeout = timeout
+        self.tiempo_maximo = tiempo_maximo
+        self.sesion = requests.Session()
+        # Sólo se reintentan conexiones fallidas y respuestas 429/5xx: una
+        # lectura agotada ya costó el tiempo máximo de lectura completo.
+        reintento = Retry(
+            total=reintentos,
+            read=0,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            raise_on_status=False,
+        )
+        adaptador = HTTPAdapter(pool_connections=conexiones, pool_maxsize=conexiones, max_retries=reintento)
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+        self._cache = {}
+        self._fallos = {}
+        self._lock = threading.Lock()
+
+    def _get_condicional(self, url, params, entrada):
+        """GET de `url`; con los validadores de `entrada` pide sólo si cambió.
+
+        Devuelve (datos, validadores); `datos` es None si la API respondió
+        304 (no cambió).
+        """
+        encabezados = {}
+        if entrada is not None:
+            if entrada.get("etag"):
+                encabezados["If-None-Match"] = entrada["etag"]
+            if entrada.get("modificado"):
+                encabezados["If-Modified-Since"] = entrada["modificado"]
+        respuesta = self.sesion.get(url, params=params, headers=encabezados, timeout=self.timeout)
+        validadores = {
+            "etag": respuesta.headers.get("ETag"),
+            "modificado": respuesta.headers.get("Last-Modified"),
+        }
+        if respuesta.status_code == 304 and encabezados:
+            return None, validadores
+        respuesta.raise_for_status()
+        return respuesta.json(), validadores
+
+    def _descargar_json(self, url, params):
+        respuesta = self.sesion.get(url, params=params, timeout=self.timeout)
+        respuesta.raise_for_status()
+        return respuesta.json()
+
+    def _paginas(self, url, tamano, concurrencia, primera, max_paginas, parametros, limite):
+        # Mantiene `concurrencia` páginas en vuelo y las entrega en orden. El
+        # ejecutor no se usa con `with`: al vencer el plazo (o cerrarse el
+        # generador) no se espera a las páginas en vuelo, que terminan solas
+        # en segundo plano al agotar su tiempo de lectura.
+        ejecutor = ThreadPoolExecutor(max_workers=concurrencia)
+        pendientes = {}
+        try:
+            siguiente = primera
+            for pagina in range(primera, max_paginas):
+                while siguiente < max_paginas and len(pendientes) < concurrencia:
+                    pendientes[siguiente] = ejecutor.submit(
+                        self._descargar_json, url, parametros(siguiente, tamano)
+                    )
+                    siguiente += 1
+                restante = max(0.0, limite - time.monotonic())
+                try:
+                    datos = pendientes.pop(pagina).result(timeout=restante)
+                except TiempoAgotado:
+                    raise requests.Timeout(f"la descarga superó {self.tiempo_maximo} s") from None
+                yield datos
+        finally:
+            for futuro in pendientes.values():
+                futuro.cancel()
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    def tabla_paginada(self, url, tamano=500, concurrencia=4, max_paginas=1000,
+                       parametros=parametros_offset, al_lote=None):
+        """Descarga una colección paginada y la devuelve como DataFrame.
+
+        Primero se pide sólo la primera página. Si no es una lista o no trae
+        exactamente `tamano` registros (la API ignora la paginación o la
+        colección cabe en una página), eso es la colección completa; si no,
+        las demás páginas se piden en paralelo y la descarga termina con la
+        primera página incompleta o que repite el primer registro. Cada
+        página se normaliza con `pd.json_normalize` al llegar y se pasa a
+        `al_lote(df_lote)`, para mostrar filas mientras sigue la descarga.
+
+        El resultado se guarda `ttl` segundos. Mientras esté vigente se
+        devuelve sin descargar y sin llamar a `al_lote`; al vencer, si la
+        colección era de una sola página, se revalida con
+        `If-None-Match`/`If-Modified-Since`. Devuelve (df, info), donde
+        `info["origen"]` es "cache" (vigente), "revalidado" (304), "red"
+        (descargado) u "obsoleto" (la API falló y se usan los últimos datos;
+        el error queda en `info["error"]`); `info["version"]` identifica los
+        datos devueltos y sirve como huella para exportarlos. Sin datos
+        previos, los errores de red y de JSON se propagan como
+        `requests.RequestException` o `ValueError`. El DataFrame se comparte
+        entre sesiones: no modificarlo.
+        """
+        llave = ("tabla", url, tamano)
+        with self._lock:
+            entrada = self._cache.get(llave)
+        ahora = time.time()
+        if entrada is not None and ahora - entrada["guardado"] < self.ttl:
+            return entrada["datos"], _info("cache", entrada, ahora - entrada["guardado"])
+        with self._lock:
+            fallo = self._fallos.get(llave)
+        if fallo is not None and ahora < fallo["hasta"]:
+            # Falló hace poco: no se vuelve a esperar a la red en cada rerun.
+            if entrada is None:
+                raise fallo["error"]
+            return entrada["datos"], _info("obsoleto", entrada, ahora - entrada["guardado"], fallo["error"])
+
+        limite = time.monotonic() + self.tiempo_maximo
+        lotes = []
+
+        def agregar(registros):
+            lote = pd.json_normalize(registros)
+            if len(lote):
+                lotes.append(lote)
+                if al_lote is not None:
+                    al_lote(lote)
+
+        try:
+            # Sólo una colección de una página se puede revalidar con la primera.
+            previa = entrada if entrada is not None and entrada["paginas"] == 1 else None
+            registros, validadores = self._get_condicional(url, parametros(0, tamano), previa)
+            if registros is None:
+                entrada = dict(entrada, guardado=time.time())
+                with self._lock:
+                    self._cache[llave] = entrada
+                return entrada["datos"], _info("revalidado", entrada)
+            if not isinstance(registros, list):
+                registros = [registros]
+            agregar(registros)
+            paginas_leidas = 1
+            if len(registros) == tamano:
+                primero = json.dumps(registros[0], sort_keys=True)
+                paginas = self._paginas(url, tamano, concurrencia, 1, max_paginas, parametros, limite)
+                try:
+                    for registros in paginas:
+                        if not isinstance(registros, list):
+                            break
+                        if registros and json.dumps(registros[0], sort_keys=True) == primero:
+                            break
+                        agregar(registros)
+                        paginas_leidas += 1
+                        if len(registros) != tamano:
+                            break
+                finally:
+                    paginas.close()
+        except (requests.RequestException, ValueError) as e:
+            with self._lock:
+                self._fallos[llave] = {"error": e, "hasta": time.time() + self.ttl_fallo}
+            if entrada is None:
+                raise
+            return entrada["datos"], _info("obsoleto", entrada, ahora - entrada["guardado"], e)
+
+        df = pd.concat(lotes, ignore_index=True) if lotes else pd.DataFrame()
+        # El ETag de la primera página sólo describe la colección si es la única;
+        # si no, cada descarga es una versión nueva.
+        marca = (paginas_leidas == 1 and validadores["etag"]) or uuid.uuid4().hex
+        version = hashlib.sha256(f"{url}\0{tamano}\0{marca}".encode("utf-8")).hexdigest()
+        entrada = dict(validadores, datos=df, paginas=paginas_leidas, version=version, guardado=time.time())
+        with self._lock:
+            self._fallos.pop(llave, None)
+            self._cache[llave] = entrada
+        return df, _info("red", entrada)
+
+
+@st.cache_resource(show_spinner=False)
+def cliente_http():
+    """Cliente compartido por todas las sesiones del proceso."""
+    return ClienteHTTP()
@@ -0,0 +1,210 @@
+"""Cola de trabajos para las llamadas al modelo, compartida por el proceso.
+
+Las preguntas se ejecutan en un grupo fijo de hilos, con un limitador de
+tasa (cubeta de tokens) y un tiempo máximo por trabajo. Si dos sesiones
+hacen la misma pregunta sobre los mismos datos mientras la primera sigue en
+curso, ambas reciben el mismo trabajo; se cancela sólo cuando ninguna
+sesión lo espera. Las sesiones no se bloquean esperando al modelo:
+consultan el estado (y el texto que ya llegó) cuando vuelven a ejecutarse.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from utils.llm import transmitir_respuesta
+
+EN_COLA = "en cola"
+EJECUTANDO = "generando"
+LISTO = "listo"
+ERROR = "error"
+VENCIDO = "vencido"
+CANCELADO = "cancelado"
+TERMINALES = {LISTO, ERROR, VENCIDO, CANCELADO}
+
+
+class ColaLlena(Exception):
+    """Hay demasiados trabajos pendientes; conviene reintentar más tarde."""
+
+
+class LimitadorTokens:
+    """Cubeta de tokens: `tasa` tokens por segundo y hasta `capacidad` acumulados."""
+
+    def __init__(self, tasa, capacidad):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._tokens = float(capacidad)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reponer(self):
+        ahora = time.monotonic()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def adquirir(self, timeout=None):
+        """Toma un token esperando lo necesario; False si se agota `timeout`."""
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._reponer()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                espera = (1 - self._tokens) / self.tasa
+            if limite is not None:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return False
+                espera = min(espera, restante)
+            time.sleep(espera)
+
+
+class Trabajo:
+    def __init__(self, clave, timeout, sesion=None):
+        self.id = uuid.uuid4().hex
+        self.clave = clave
+        self.estado = EN_COLA
+        self.texto = ""
+        self.error = None
+        self.metricas = {}
+        self.creado = time.monotonic()
+        self.limite = self.creado + timeout
+        # Sesiones que esperan el trabajo (un conjunto: repetir la pregunta no suma).
+        self.suscriptores = {sesion}
+        self._condicion = threading.Condition()
+
+    @property
+    def terminado(self):
+        self._revisar_vencimiento()
+        return self.estado in TERMINALES
+
+    def _revisar_vencimiento(self):
+        # La llamada al modelo recibe el tiempo restante como timeout, así
+        # que el hilo queda libre cerca del vencimiento; lo que llegue
+        # después se descarta.
+        if self.estado not in TERMINALES and time.monotonic() > self.limite:
+            self._terminar(VENCIDO)
+
+    def _terminar(self, estado, error=None):
+        with self._condicion:
+            if self.estado in TERMINALES:
+                return False
+            self.estado = estado
+            self.error = error
+            self._condicion.notify_all()
+            return True
+
+    def _iniciar(self):
+        with self._condicion:
+            if self.estado == EN_COLA:
+                self.estado = EJECUTANDO
+
+    def _agregar(self, texto):
+        with self._condicion:
+            if self.estado in TERMINALES:
+                return False
+            self.estado = EJECUTANDO
+            self.texto += texto
+            self._condicion.notify_all()
+            return True
+
+class ColaLLM:
+    def __init__(self, trabajadores=4, tasa=1.0, rafaga=5, timeout=120, max_pendientes=50):
+        self.timeout = timeout
+        self.max_pendientes = max_pendientes
+        self.limitador = LimitadorTokens(tasa, rafaga)
+        self._ejecutor = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self._trabajos = {}
+        self._en_vuelo = {}
+        self.contadores = {"enviados": 0, "deduplicados": 0, "rechazados": 0}
+
+    def enviar(self, clave, modelo, prompt, al_terminar=None, sesion=None):
+        """Encola la pregunta o devuelve el trabajo en curso con la misma clave.
+
+        `sesion` identifica a quien espera el trabajo (ver `soltar`).
+
+        `al_terminar(texto)` se llama en el hilo trabajador cuando la
+        respuesta está completa (por ejemplo, para guardarla en la caché).
+        """
+        with self._lock:
+            actual = self._en_vuelo.get(clave)
+            if actual is not None and not actual.terminado:
+                if sesion not in actual.suscriptores:
+                    actual.suscriptores.add(sesion)
+                    self.contadores["deduplicados"] += 1
+                return actual
+            if self.pendientes() >= self.max_pendientes:
+                self.contadores["rechazados"] += 1
+                raise ColaLlena(f"Hay {self.max_pendientes} preguntas pendientes; intenta de nuevo en un momento.")
+            trabajo = Trabajo(clave, self.timeout, sesion)
+            self._trabajos[trabajo.id] = trabajo
+            self._en_vuelo[clave] = trabajo
+            self.contadores["enviados"] += 1
+        self._ejecutor.submit(self._ejecutar, trabajo, modelo, prompt, al_terminar)
+        return trabajo
+
+    def _ejecutar(self, trabajo, modelo, prompt, al_terminar):
+        try:
+            restante = trabajo.limite - time.monotonic()
+            if trabajo.terminado:
+                return
+            if not self.limitador.adquirir(timeout=restante):
+                trabajo._terminar(VENCIDO)
+                return
+            trabajo._iniciar()
+            restante = trabajo.limite - time.monotonic()
+            flujo = transmitir_respuesta(modelo, prompt, trabajo.metricas, timeout=max(restante, 0.0))
+            try:
+                for parte in flujo:
+                    # Cancelado o vencido: se cierra el flujo del modelo.
+                    if trabajo.terminado or not trabajo._agregar(parte):
+                        return
+            finally:
+                flujo.close()
+            if al_terminar is not None:
+                al_terminar(trabajo.texto)
+            trabajo._terminar(LISTO)
+        except Exception as e:
+            # Un timeout del modelo al llegar al límite cuenta como vencido.
+            trabajo._revisar_vencimiento()
+            trabajo._terminar(ERROR, str(e))
+        finally:
+            with self._lock:
+                if self._en_vuelo.get(trabajo.clave) is trabajo:
+                    del self._en_vuelo[trabajo.clave]
+                self._olvidar_viejos()
+
+    def _olvidar_viejos(self, antiguedad=3600):
+        limite = time.monotonic() - antiguedad
+        for id_trabajo in [i for i, t in self._trabajos.items() if t.terminado and t.creado < limite]:
+            del self._trabajos[id_trabajo]
+
+    def obtener(self, id_trabajo):
+        return self._trabajos.get(id_trabajo)
+
+    def soltar(self, trabajo, sesion=None):
+        """La sesión `sesion` ya no espera el trabajo; se cancela si nadie más lo hace."""
+        with self._lock:
+            trabajo.suscriptores.discard(sesion)
+            if not trabajo.suscriptores and not trabajo.terminado:
+                trabajo._terminar(CANCELADO)
+
+    def pendientes(self):
+        return sum(1 for t in self._en_vuelo.values() if not t.terminado)
+
+    def posicion(self, trabajo):
+        """Cuántos trabajos en cola se enviaron antes que `trabajo`."""
+        return sum(
+            1 for t in list(self._trabajos.values())
+            if t.estado == EN_COLA and t.creado < trabajo.creado
+        )
+
+
+@st.cache_resource(show_spinner=False)
+def cola_llm():
+    """Cola compartida por todas las sesiones del proceso."""
+    return ColaLLM()
@@ -0,0 +1,119 @@
+"""Contexto acotado por tokens para las preguntas al modelo.
+
+En lugar de enviar toda la tabla en cada prompt, se buscan en la pregunta
+los años, departamentos y municipios mencionados, se agregan los totales
+precalculados del cubo y luego tantas filas relevantes como quepan en el
+presupuesto de tokens.
+"""
+import math
+import re
+import unicodedata
+
+from utils.tabla import posiciones_visibles
+
+# Aproximación usual para texto en español con tokenizadores tipo BPE.
+CARACTERES_POR_TOKEN = 4
+PRESUPUESTO_TOKENS = 4000
+MAX_GRUPOS = 15
+
+
+def estimar_tokens(texto):
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes y con la puntuación reemplazada por espacios."""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^a-z0-9ñ]+", " ", texto).split())
+
+
+def _variantes(valor):
+    # "BOGOTA D.C." también debe encontrarse como "Bogotá".
+    completo = normalizar(valor)
+    corto = " ".join(p for p in normalizar(re.split(r"[.,(]", str(valor))[0]).split() if len(p) > 1)
+    return {v for v in (completo, corto) if v}
+
+
+def detectar_filtros(pregunta, valores):
+    """Busca en la pregunta valores de las columnas indexadas.
+
+    `valores` es `{columna: lista_de_valores}` (por ejemplo,
+    `IndiceValores.valores`). Las columnas numéricas se buscan como números
+    y las de texto como palabras completas, probando primero los nombres
+    más largos para que "NORTE DE SANTANDER" no cuente también como
+    "SANTANDER".
+    """
+    texto = f" {normalizar(pregunta)} "
+    filtros = {}
+    candidatos = []
+    for columna, lista in valores.items():
+        for valor in lista:
+            if isinstance(valor, (int, float)):
+                if re.search(rf"\b{int(valor)}\b", texto):
+                    filtros.setdefault(columna, []).append(valor)
+            else:
+                candidatos.extend((variante, columna, valor) for variante in _variantes(valor))
+    for variante, columna, valor in sorted(candidatos, key=lambda c: -len(c[0])):
+        patron = f" {variante} "
+        if patron in texto:
+            if valor not in filtros.get(columna, []):
+                filtros.setdefault(columna, []).append(valor)
+            texto = texto.replace(patron, " ")
+    return filtros
+
+
+def _tabla_texto(df):
+    return df.to_csv(index=False).strip()
+
+
+def construir_contexto(pregunta, df, indice, cubo, orden=None, presupuesto_tokens=PRESUPUESTO_TOKENS,
+                       tokens_completos=None):
+    """Arma el contexto del prompt dentro de `presupuesto_tokens`.
+
+    Devuelve un diccionario con el texto del contexto, los filtros
+    detectados, las filas relevantes e incluidas, los tokens usados y, si se
+    pasa `tokens_completos` (lo que costaría enviar la tabla completa), los
+    tokens ahorrados.
+    """
+    filtros = detectar_filtros(pregunta, indice.valores)
+    cubo_filtrado = cubo.filtrar(filtros)
+
+    partes = ["Datos de casos de trata de personas en Colombia."]
+    if filtros:
+        descripcion = "; ".join(f"{c}: {', '.join(map(str, v))}" for c, v in filtros.items())
+        partes.append(f"Filtros detectados en la pregunta: {descripcion}.")
+    partes.append(f"Total de casos: {cubo_filtrado.total()}")
+    for dimension in ['AÑO', 'DEPARTAMENTO', 'DESCRIPCION CONDUCTA']:
+        grupos = cubo_filtrado.por(dimension)
+        if dimension != 'AÑO':
+            grupos = grupos.sort_values(cubo.medida, ascending=False).head(MAX_GRUPOS)
+        partes.append(f"Casos por {dimension.lower()}:\n{_tabla_texto(grupos)}")
+    texto = "\n\n".join(partes)
+
+    seleccion = posiciones_visibles(len(df), orden, indice.filas(filtros) if filtros else None)
+    restante = presupuesto_tokens - estimar_tokens(texto)
+    incluidas = 0
+    if restante > 0 and len(seleccion):
+        # Se prueba con un lote pequeño para estimar el tamaño de una fila.
+        muestra = _tabla_texto(df.take(seleccion[:20]))
+        tokens_fila = max(1, estimar_tokens(muestra) / (muestra.count("\n") + 1))
+        incluidas = min(len(seleccion), max(0, int(restante / tokens_fila) - 1))
+        while incluidas:
+            bloque = _tabla_texto(df.take(seleccion[:incluidas]))
+            candidato = f"{texto}\n\nFilas relevantes ({incluidas} de {len(seleccion)}):\n{bloque}"
+            if estimar_tokens(candidato) <= presupuesto_tokens:
+                texto = candidato
+                break
+            incluidas = int(incluidas * 0.9)
+
+    tokens = estimar_tokens(texto)
+    return {
+        "texto": texto,
+        "filtros": filtros,
+        "filas_relevantes": len(seleccion),
+        "filas_incluidas": incluidas,
+        "tokens": tokens,
+        "tokens_ahorrados": None if tokens_completos is None else max(0, tokens_completos - tokens),
+    }
+
@@ -0,0 +1,63 @@
+"""Cubo de agregación precalculado.
+
+El cubo guarda la suma de una medida por cada combinación observada de
+dimensiones. Las métricas y gráficos se responden filtrando y reagrupando
+el cubo, cuyo tamaño depende del número de grupos y no del de filas.
+"""
+import pandas as pd
+
+from utils.esquema import concatenar
+
+
+class Cubo:
+    def __init__(self, df, dimensiones, medida):
+        self.dimensiones = list(dimensiones)
+        self.medida = medida
+        self.datos = self._agrupar(df)
+
+    def _agrupar(self, df):
+        # dropna=False conserva las filas sin año u otra dimensión, así el
+        # total del cubo coincide con el de la tabla original.
+        return (
+            df.groupby(self.dimensiones, observed=True, dropna=False)[self.medida]
+            .sum()
+            .reset_index()
+        )
+
+    def _con_datos(self, datos):
+        cubo = Cubo.__new__(Cubo)
+        cubo.dimensiones = self.dimensiones
+        cubo.medida = self.medida
+        cubo.datos = datos
+        return cubo
+
+    def __len__(self):
+        return len(self.datos)
+
+    def agregar(self, df):
+        """Devuelve un cubo que incluye además las filas de `df`."""
+        return self._con_datos(self._agrupar(concatenar([self.datos, self._agrupar(df)])))
+
+    def filtrar(self, filtros):
+        """Devuelve un cubo con las celdas cuyas dimensiones están en `filtros`.
+
+        `filtros` es un diccionario `{dimension: valores}`.
+        """
+        mascara = pd.Series(True, index=self.datos.index)
+        for dimension, valores in filtros.items():
+            mascara &= self.datos[dimension].isin(valores)
+        return self._con_datos(self.datos[mascara])
+
+    def total(self):
+        return self.datos[self.medida].sum()
+
+    def distintos(self, dimension):
+        return self.datos[dimension].nunique()
+
+    def por(self, dimension):
+        """Suma de la medida agrupada por `dimension`, como DataFrame."""
+        return (
+            self.datos.groupby(dimension, observed=True)[self.medida]
+            .sum()
+            .reset_index()
+        )
@@ -0,0 +1,94 @@
+"""Ediciones por sesión sobre un DataFrame compartido.
+
+La tabla base (en caché y compartida entre sesiones) nunca se modifica.
+Cada sesión guarda sus cambios como un registro disperso de lotes
+`[(índice, columna, valor), ...]`; al leer, los cambios se superponen sólo
+sobre la parte de la tabla que se va a mostrar. La memoria por sesión crece
+con el número de ediciones, no con el tamaño de la tabla. Deshacer quita el
+último lote completo.
+"""
+import streamlit as st
+
+
+class Ediciones:
+    def __init__(self):
+        self._lotes = []
+        self._actuales = {}
+        self.version = 0
+
+    def __len__(self):
+        """Número de celdas con un valor editado."""
+        return len(self._actuales)
+
+    @property
+    def lotes(self):
+        return len(self._lotes)
+
+    def _recalcular(self):
+        self._actuales = {}
+        for lote in self._lotes:
+            for indice, columna, valor in lote:
+                self._actuales[(indice, columna)] = valor
+        self.version += 1
+
+    def confirmar(self, cambios):
+        """Agrega un lote de cambios `[(índice, columna, valor), ...]`."""
+        cambios = list(cambios)
+        if cambios:
+            self._lotes.append(cambios)
+            for indice, columna, valor in cambios:
+                self._actuales[(indice, columna)] = valor
+            self.version += 1
+        return len(cambios)
+
+    def editar(self, indice, columna, valor):
+        return self.confirmar([(indice, columna, valor)])
+
+    def deshacer(self):
+        """Quita el último lote; devuelve cuántas celdas tenía."""
+        if not self._lotes:
+            return 0
+        lote = self._lotes.pop()
+        self._recalcular()
+        return len(lote)
+
+    def vista(self, parcial):
+        """`parcial` (una porción de la tabla base) con las ediciones superpuestas.
+
+        Si ninguna edición cae en la porción se devuelve el mismo objeto, sin
+        copiar.
+        """
+        columnas = set(parcial.columns)
+        aplicables = [
+            (indice, columna, valor)
+            for (indice, columna), valor in self._actuales.items()
+            if columna in columnas and indice in parcial.index
+        ]
+        if not aplicables:
+            return parcial
+        resultado = parcial.copy()
+        for indice, columna, valor in aplicables:
+            resultado.at[indice, columna] = valor
+        return resultado
+
+    def fila(self, df, posicion):
+        """Fila en la posición `posicion` de `df` con las ediciones aplicadas."""
+        return self.vista(df.iloc[[posicion]]).iloc[0]
+
+    @staticmethod
+    def diferencias(original, editado, columnas=None):
+        """Cambios `(índice, columna, valor)` entre dos DataFrames con el mismo índice."""
+        cambios = []
+        for columna in columnas or original.columns:
+            antes, despues = original[columna], editado[columna]
+            distintos = ~((antes == despues) | (antes.isna() & despues.isna()))
+            cambios.extend((indice, columna, despues[indice]) for indice in despues.index[distintos.to_numpy()])
+        return cambios
+
+
+def ediciones(clave):
+    """Registro de ediciones de la sesión actual para la tabla `clave`."""
+    nombre = f"ediciones_{clave}"
+    if nombre not in st.session_state:
+        st.session_state[nombre] = Ediciones()
+    return st.session_state[nombre]
@@ -0,0 +1,76 @@
+"""Esquemas declarativos para convertir columnas de texto a tipos compactos.
+
+Un esquema es un diccionario `{columna: tipo}` donde el tipo puede ser:
+
+- `"category"`: columna de texto con diccionario (pocas categorías repetidas).
+- un entero nullable de pandas (`"UInt8"`, `"Int16"`, `"UInt32"`, ...).
+- `("fecha", formato)`: fecha con formato explícito para `strptime`.
+
+`aplicar_esquema` devuelve el DataFrame convertido y un reporte con las
+filas cuyo valor no se pudo convertir (quedan como nulos).
+"""
+import numpy as np
+import pandas as pd
+
+MAX_MUESTRAS = 50
+
+
+def _convertir_entero(serie, tipo):
+    numeros = pd.to_numeric(serie, errors='coerce')
+    info = np.iinfo(pd.api.types.pandas_dtype(tipo).numpy_dtype)
+    validos = (numeros % 1 == 0) & numeros.between(info.min, info.max)
+    return numeros.where(validos).astype(tipo)
+
+
+def convertir_columna(serie, tipo):
+    """Convierte una serie al tipo declarado; lo que falle queda nulo."""
+    if isinstance(tipo, tuple) and tipo[0] == "fecha":
+        return pd.to_datetime(serie, format=tipo[1], errors='coerce')
+    if tipo == "category":
+        return serie.astype("category")
+    return _convertir_entero(serie, tipo)
+
+
+def aplicar_esquema(df, esquema, desfase_fila=2):
+    """Aplica el esquema a `df` y reporta los valores que no se convirtieron.
+
+    `desfase_fila` traduce el índice del DataFrame a la línea del archivo
+    (2 para un CSV con encabezado). Devuelve (df_convertido, reporte), donde
+    el reporte es un diccionario serializable a JSON.
+    """
+    df = df.copy()
+    errores = {}
+    muestras = []
+    for columna, tipo in esquema.items():
+        if columna not in df.columns:
+            errores[columna] = "columna ausente"
+            continue
+        original = df[columna]
+        convertida = convertir_columna(original, tipo)
+        fallidas = original.notna() & convertida.isna()
+        if fallidas.any():
+            errores[columna] = int(fallidas.sum())
+            for fila, valor in original[fallidas].head(MAX_MUESTRAS - len(muestras)).items():
+                muestras.append({"fila": int(fila) + desfase_fila, "columna": columna, "valor": str(valor)})
+        df[columna] = convertida
+    reporte = {"filas": len(df), "errores": errores, "muestras": muestras}
+    return df, reporte
+
+
+def concatenar(frames):
+    """Concatena DataFrames conservando las columnas categóricas.
+
+    `pd.concat` convierte a `object` las categóricas con categorías
+    distintas; aquí se unen las categorías antes de concatenar.
+    """
+    frames = list(frames)
+    for columna in frames[0].columns:
+        if isinstance(frames[0][columna].dtype, pd.CategoricalDtype):
+            categorias = pd.api.types.union_categoricals(
+                [f[columna] for f in frames], sort_categories=True, ignore_order=True
+            ).categories
+            frames = [
+                f.assign(**{columna: f[columna].cat.set_categories(categorias)})
+                for f in frames
+            ]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,116 @@
+"""Lectura rápida de libros de Excel.
+
+Cada hoja se lee una sola vez con openpyxl en modo de sólo lectura (fila
+por fila, sin cargar el libro completo) y se guarda como tabla Arrow en
+`.cache/excel`, con el hash del archivo, la hoja y el rango de columnas en
+el nombre. Las lecturas siguientes abren esa tabla con memory-map, sin
+volver a parsear el XML del libro. Con `columnas` (por ejemplo "B:D")
+sólo se leen las celdas de ese rango.
+"""
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from utils.snapshot import escribir_atomico, hash_vigente, huella_archivo
+
+DIRECTORIO_EXCEL = Path(".cache") / "excel"
+
+
+def _abrir_libro(ruta):
+    # Import diferido: si la tabla ya está en caché no hace falta openpyxl.
+    import openpyxl
+
+    return openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+
+
+@lru_cache(maxsize=64)
+def _hojas(ruta, mtime_ns, tamano):
+    libro = _abrir_libro(ruta)
+    try:
+        return tuple(libro.sheetnames)
+    finally:
+        libro.close()
+
+
+def hojas(ruta):
+    """Nombres de las hojas del libro (sólo lee el índice del archivo)."""
+    return list(_hojas(str(ruta), *huella_archivo(ruta)))
+
+
+def _limites_columnas(columnas):
+    if columnas is None:
+        return None, None
+    from openpyxl.utils.cell import column_index_from_string
+
+    inicio, _, fin = columnas.upper().partition(":")
+    return column_index_from_string(inicio), column_index_from_string(fin or inicio)
+
+
+def _nombres(encabezado):
+    # Igual que pandas: "Unnamed: i" para celdas vacías y sufijos para repetidos.
+    nombres = []
+    for i, valor in enumerate(encabezado):
+        nombre = f"Unnamed: {i}" if valor is None else str(valor)
+        base, n = nombre, 0
+        while nombre in nombres:
+            n += 1
+            nombre = f"{base}.{n}"
+        nombres.append(nombre)
+    return nombres
+
+
+def _columna(valores):
+    try:
+        return pa.array(valores, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Tipos mezclados en la columna: se guarda como texto.
+        return pa.array([None if v is None else str(v) for v in valores], pa.string())
+
+
+def _convertir_hoja(ruta, hoja, columnas):
+    libro = _abrir_libro(ruta)
+    try:
+        hoja_libro = libro[hoja] if hoja is not None else libro.worksheets[0]
+        min_col, max_col = _limites_columnas(columnas)
+        filas = hoja_libro.iter_rows(min_col=min_col, max_col=max_col, values_only=True)
+        encabezado = next(filas, ())
+        datos = [[] for _ in encabezado]
+        vacias = 0
+        for fila in filas:
+            # Las filas vacías sólo se agregan si después aparece una con datos.
+            if all(v is None for v in fila):
+                vacias += 1
+                continue
+            for valores in datos:
+                valores.extend([None] * vacias)
+            vacias = 0
+            for valores, valor in zip(datos, fila):
+                valores.append(valor)
+    finally:
+        libro.close()
+    return pa.table([_columna(v) for v in datos], names=_nombres(encabezado))
+
+
+def leer_hoja(ruta, hoja=None, columnas=None):
+    """Devuelve la hoja `hoja` (nombre; por defecto la primera) como tabla Arrow.
+
+    `columnas` es un rango de letras de Excel, como "A:C". La tabla está
+    mapeada desde la caché en disco y se comparte: no modificarla.
+    """
+    ruta = str(ruta)
+    digest = hash_vigente(ruta)
+    llave = hashlib.sha256(f"{hoja}\0{columnas}".encode("utf-8")).hexdigest()[:8]
+    destino = DIRECTORIO_EXCEL / f"{Path(ruta).stem}-{digest[:16]}-{llave}.feather"
+    if not destino.exists():
+        tabla = _convertir_hoja(ruta, hoja, columnas)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        escribir_atomico(destino, lambda temporal: feather.write_feather(tabla, temporal, compression="uncompressed"))
+    return feather.read_table(destino, memory_map=True)
+
+
+def leer_excel(ruta, hoja=None, columnas=None):
+    """Como `leer_hoja`, pero devuelve un DataFrame."""
+    return leer_hoja(ruta, hoja, columnas).to_pandas()
@@ -0,0 +1,166 @@
+"""Exportación de tablas para los botones de descarga.
+
+El archivo sólo se genera cuando el usuario lo pide y queda guardado en
+disco con la huella de los datos y el formato en el nombre, de modo que
+los reruns y las demás sesiones lo reutilizan sin volver a serializar. Se
+escribe por bloques de filas, sin armar un único string con todo el
+contenido.
+"""
+import gzip
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils.snapshot import escribir_atomico
+
+DIRECTORIO_EXPORTES = Path(".cache") / "exportes"
+FILAS_POR_BLOQUE = 50_000
+MAX_ARCHIVOS = 20
+# Los archivos usados hace menos de esto no se borran: otra sesión puede
+# estar por enviarlos.
+PROTECCION_SEGUNDOS = 300
+
+# Nombre visible: (extensión, tipo MIME).
+FORMATOS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV comprimido (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def huella_datos(df):
+    """Hash del contenido y las columnas de `df` (no depende del índice).
+
+    Recorre toda la tabla: si ya se tiene una versión de los datos (ETag,
+    versión de la instantánea), conviene pasarla como `huella`.
+    """
+    digest = hashlib.sha256("\0".join(map(str, df.columns)).encode("utf-8"))
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        # Celdas con listas o diccionarios (JSON anidado) no se pueden hashear.
+        hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+    digest.update(hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _huella_exporte(df, huella, filas):
+    huella = huella or huella_datos(df)
+    if filas is None:
+        return huella
+    posiciones = np.ascontiguousarray(filas, dtype=np.int64)
+    return hashlib.sha256(huella.encode("utf-8") + posiciones.tobytes()).hexdigest()
+
+
+def _bloques(df, filas, tamano):
+    posiciones = np.arange(len(df)) if filas is None else np.asarray(filas)
+    if not len(posiciones):
+        yield df.iloc[:0]
+    for inicio in range(0, len(posiciones), tamano):
+        yield df.take(posiciones[inicio:inicio + tamano])
+
+
+def _escribir_csv(archivo, bloques):
+    for i, bloque in enumerate(bloques):
+        bloque.to_csv(archivo, header=i == 0, index=False)
+
+
+def _escribir_parquet(ruta, df, bloques):
+    # Se infiere con todas las filas: un bloque puede tener columnas sólo con nulos.
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(ruta, esquema) as escritor:
+        for bloque in bloques:
+            escritor.write_table(pa.Table.from_pandas(bloque, schema=esquema, preserve_index=False))
+
+
+def _podar(directorio, max_archivos, proteccion=PROTECCION_SEGUNDOS):
+    archivos = []
+    for ruta in directorio.iterdir():
+        if ruta.suffix == ".tmp":
+            continue
+        try:
+            archivos.append((ruta.stat().st_mtime, ruta))
+        except FileNotFoundError:
+            continue  # Lo borró otra sesión.
+    archivos.sort(reverse=True)
+    recientes = time.time() - proteccion
+    for modificado, ruta in archivos[max_archivos:]:
+        if modificado < recientes:
+            ruta.unlink(missing_ok=True)
+
+
+def ruta_exporte(huella, formato, directorio=DIRECTORIO_EXPORTES):
+    extension, _ = FORMATOS[formato]
+    return Path(directorio) / f"{huella[:24]}{extension}"
+
+
+def exportar(df, formato, huella=None, filas=None, tamano_bloque=FILAS_POR_BLOQUE,
+             directorio=DIRECTORIO_EXPORTES):
+    """Escribe `df` (o sólo las posiciones `filas`, en ese orden) en `formato`.
+
+    Si ya existe un exporte con los mismos datos y formato se reutiliza.
+    `huella` identifica a `df` (por ejemplo, la versión del dataset); si no
+    se pasa, se calcula con `huella_datos`. Las posiciones `filas` se suman
+    a la huella. Devuelve la ruta del archivo.
+    """
+    ruta = ruta_exporte(_huella_exporte(df, huella, filas), formato, directorio)
+    if ruta.exists():
+        os.utime(ruta)
+        return ruta
+
+    def escribir(temporal):
+        bloques = _bloques(df, filas, tamano_bloque)
+        if formato == "Parquet":
+            _escribir_parquet(temporal, df, bloques)
+        elif formato == "CSV comprimido (gzip)":
+            with gzip.open(temporal, "wt", encoding="utf-8-sig", newline="") as archivo:
+                _escribir_csv(archivo, bloques)
+        else:
+            with open(temporal, "w", encoding="utf-8-sig", newline="") as archivo:
+                _escribir_csv(archivo, bloques)
+
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    escribir_atomico(ruta, escribir)
+    _podar(ruta.parent, MAX_ARCHIVOS)
+    return ruta
+
+
+def boton_descarga(df, nombre, clave, huella=None, filas=None, etiqueta="📥 Descargar datos"):
+    """Selector de formato y botón de descarga que genera el archivo a pedido.
+
+    `nombre` es el nombre del archivo sin extensión y `huella` una versión
+    de `df` que el llamador ya tenga (si falta, se calcula con
+    `huella_datos` al pedir la descarga). `filas` puede ser una función que
+    devuelva las posiciones, para calcularlas sólo al pedir la descarga.
+
+    Se muestra un botón "Preparar descarga": sólo al pulsarlo se genera el
+    archivo (o se reutiliza el guardado) y se ofrece para descargar, así
+    los demás reruns no leen ni envían el archivo.
+    """
+    col_formato, col_boton = st.columns([1, 2])
+    with col_formato:
+        formato = st.selectbox("Formato", list(FORMATOS), key=f"{clave}_formato")
+    extension, mime = FORMATOS[formato]
+    with col_boton:
+        if not st.button("⚙️ Preparar descarga", key=f"{clave}_preparar"):
+            return
+        with st.spinner("Generando archivo…"):
+            if callable(filas):
+                filas = filas()
+            ruta = exportar(df, formato, huella=huella, filas=filas)
+        with open(ruta, "rb") as archivo:
+            st.download_button(
+                label=etiqueta,
+                data=archivo,
+                file_name=f"{nombre}{extension}",
+                mime=mime,
+                key=f"{clave}_descargar",
+                on_click="ignore",
+            )
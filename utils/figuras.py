@@ -0,0 +1,87 @@
+"""Almacén de figuras de matplotlib ya renderizadas.
+
+Cada figura se guarda como PNG bajo una llave que incluye la versión de
+los datos (por ejemplo, `(version, año)`), así que mostrarla de nuevo es
+una búsqueda. `prerenderizar` dibuja en segundo plano las que se van a
+necesitar; si una sesión pide una que todavía se está dibujando, espera
+ese mismo trabajo en vez de repetirlo.
+
+Se usa `matplotlib.figure.Figure` directamente (sin `pyplot`), que no
+comparte estado global y se puede dibujar desde otros hilos.
+"""
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from matplotlib.figure import Figure
+
+
+def renderizar(dibujar, dpi=200):
+    """Crea una figura, llama a `dibujar(fig)` y devuelve el PNG.
+
+    Usa los mismos parámetros que `st.pyplot` (200 dpi, recorte ajustado).
+    """
+    fig = Figure()
+    dibujar(fig)
+    salida = io.BytesIO()
+    fig.savefig(salida, format="png", dpi=dpi, bbox_inches="tight")
+    return salida.getvalue()
+
+
+class AlmacenFiguras:
+    def __init__(self, max_entradas=128, trabajadores=1):
+        self.max_entradas = max_entradas
+        self._figuras = OrderedDict()
+        self._en_curso = {}
+        self._lock = threading.Lock()
+        self._ejecutor = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix="figuras")
+
+    def _guardar(self, llave, png):
+        with self._lock:
+            self._figuras[llave] = png
+            self._figuras.move_to_end(llave)
+            while len(self._figuras) > self.max_entradas:
+                self._figuras.popitem(last=False)
+            self._en_curso.pop(llave, None)
+
+    def _renderizar(self, llave, dibujar):
+        try:
+            png = renderizar(dibujar)
+        except Exception:
+            # Un fallo no queda guardado: el próximo pedido lo vuelve a intentar.
+            with self._lock:
+                self._en_curso.pop(llave, None)
+            raise
+        self._guardar(llave, png)
+        return png
+
+    def obtener(self, llave, dibujar):
+        """Devuelve el PNG de `llave`, dibujándolo con `dibujar(fig)` si hace falta."""
+        with self._lock:
+            png = self._figuras.get(llave)
+            if png is not None:
+                self._figuras.move_to_end(llave)
+                return png
+            futuro = self._en_curso.get(llave)
+        if futuro is not None:
+            return futuro.result()
+        return self._renderizar(llave, dibujar)
+
+    def prerenderizar(self, trabajos):
+        """Encola en segundo plano los `(llave, dibujar)` que no estén listos."""
+        with self._lock:
+            for llave, dibujar in trabajos:
+                if llave not in self._figuras and llave not in self._en_curso:
+                    self._en_curso[llave] = self._ejecutor.submit(self._renderizar, llave, dibujar)
+
+    def __contains__(self, llave):
+        with self._lock:
+            return llave in self._figuras
+
+
+@st.cache_resource(show_spinner=False)
+def almacen_figuras():
+    """Almacén compartido por todas las sesiones del proceso."""
+    return AlmacenFiguras()
@@ -0,0 +1,219 @@
+"""Filtros combinables evaluados en una sola pasada.
+
+Cada filtro activo de la página es un predicado (`Rango`, `EnLista`,
+`Contiene`, `EsNulo`). `MotorFiltros` combina sus máscaras booleanas sobre
+los arreglos de las columnas, sin crear DataFrames intermedios, y devuelve
+las posiciones de las filas que cumplen todos. Las comparaciones numéricas
+se agrupan en una sola expresión que, si `numexpr` está instalado, se
+evalúa en una pasada. Si el motor tiene un `IndiceRango`, el rango indexado
+más selectivo da las filas candidatas por búsqueda binaria y los demás
+filtros se evalúan sólo sobre ellas.
+
+Los resultados se guardan por la llave canónica del conjunto de filtros
+(no importa el orden en que se activaron), así que volver a una
+combinación anterior no recalcula nada.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.indices import IndiceRango
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+
+def _numeros(serie):
+    """Arreglo numérico de la columna (las fechas, como enteros en ns)."""
+    valores = serie.to_numpy()
+    if valores.dtype.kind == "M":
+        return valores.view("int64")
+    return valores
+
+
+def _escalar(serie, valor):
+    if serie.dtype.kind == "M":
+        return pd.Timestamp(valor).as_unit("ns").value
+    return valor
+
+
+def _por_valor(serie, coincide):
+    """Máscara a partir de `coincide(valores_distintos) -> bool array`.
+
+    En columnas categóricas se evalúa sólo sobre las categorías y luego se
+    reparte a las filas por su código, en lugar de recorrer todas las filas.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        tabla = np.append(np.asarray(coincide(serie.cat.categories), dtype=bool), False)
+        return tabla[serie.cat.codes.to_numpy()]
+    return np.asarray(coincide(serie), dtype=bool)
+
+
+class Rango:
+    """`minimo <= columna <= maximo` (cada extremo es opcional y puede ser estricto)."""
+
+    def __init__(self, columna, minimo=None, maximo=None, incluir_minimo=True, incluir_maximo=True):
+        self.columna = columna
+        self.minimo = minimo
+        self.maximo = maximo
+        self.incluir_minimo = incluir_minimo
+        self.incluir_maximo = incluir_maximo
+
+    @property
+    def llave(self):
+        return ("rango", self.columna, self.minimo, self.maximo, self.incluir_minimo, self.incluir_maximo)
+
+    def comparaciones(self, serie):
+        """Lista de (operador, valor) sobre `_numeros(serie)`."""
+        resultado = []
+        if self.minimo is not None:
+            resultado.append((">=" if self.incluir_minimo else ">", _escalar(serie, self.minimo)))
+        if self.maximo is not None:
+            resultado.append(("<=" if self.incluir_maximo else "<", _escalar(serie, self.maximo)))
+        return resultado
+
+    def mascara(self, df):
+        serie = df[self.columna]
+        valores = _numeros(serie)
+        mascara = np.ones(len(serie), dtype=bool)
+        for operador, valor in self.comparaciones(serie):
+            np.logical_and(mascara, _OPERADORES[operador](valores, valor), out=mascara)
+        if serie.dtype.kind == "M" and serie.hasnans:
+            np.logical_and(mascara, serie.notna().to_numpy(), out=mascara)
+        return mascara
+
+
+class EnLista:
+    """La columna toma alguno de `valores` (o ninguno, con `negar=True`)."""
+
+    def __init__(self, columna, valores, negar=False):
+        self.columna = columna
+        self.valores = tuple(valores)
+        self.negar = negar
+
+    @property
+    def llave(self):
+        return ("en_lista", self.columna, tuple(sorted(self.valores, key=repr)), self.negar)
+
+    def mascara(self, df):
+        mascara = _por_valor(df[self.columna], lambda valores: np.isin(valores, self.valores))
+        return ~mascara if self.negar else mascara
+
+
+class Contiene:
+    """La columna de texto contiene `texto` (sin distinguir mayúsculas, como `str.contains`)."""
+
+    def __init__(self, columna, texto):
+        self.columna = columna
+        self.texto = texto
+
+    @property
+    def llave(self):
+        return ("contiene", self.columna, self.texto)
+
+    def mascara(self, df):
+        return _por_valor(
+            df[self.columna],
+            lambda valores: pd.Series(valores).str.contains(self.texto, case=False, na=False).to_numpy(),
+        )
+
+
+class EsNulo:
+    def __init__(self, columna):
+        self.columna = columna
+
+    @property
+    def llave(self):
+        return ("nulo", self.columna)
+
+    def mascara(self, df):
+        return df[self.columna].isna().to_numpy()
+
+
+_OPERADORES = {">=": np.greater_equal, ">": np.greater, "<=": np.less_equal, "<": np.less}
+
+
+def llave_plan(predicados):
+    """Llave canónica: independiente del orden en que se agregaron los filtros."""
+    return tuple(sorted({p.llave for p in predicados}, key=repr))
+
+
+class MotorFiltros:
+    def __init__(self, df, max_resultados=32, columnas_indexadas=()):
+        self.df = df
+        self.indice = IndiceRango(df, columnas_indexadas) if columnas_indexadas else None
+        self.max_resultados = max_resultados
+        self._resultados = OrderedDict()
+        self._lock = threading.Lock()
+        self.usa_numexpr = numexpr is not None
+
+    def _mascara_numexpr(self, rangos):
+        # Todas las comparaciones numéricas en una sola expresión.
+        partes, variables = [], {}
+        for predicado in rangos:
+            serie = self.df[predicado.columna]
+            nombre = f"c{len(variables)}"
+            variables[nombre] = _numeros(serie)
+            for operador, valor in predicado.comparaciones(serie):
+                constante = f"k{len(variables)}"
+                variables[constante] = valor
+                partes.append(f"({nombre} {operador} {constante})")
+        return numexpr.evaluate(" & ".join(partes), local_dict=variables)
+
+    def _evaluar_con_indice(self, predicados, indexados):
+        def limites(p):
+            return p.columna, p.minimo, p.maximo, p.incluir_minimo, p.incluir_maximo
+
+        mejor = min(indexados, key=lambda p: self.indice.contar(*limites(p)))
+        candidatas = self.indice.filas(*limites(mejor))
+        resto = [p for p in predicados if p is not mejor]
+        if not resto or not len(candidatas):
+            return candidatas
+        subconjunto = self.df[list(dict.fromkeys(p.columna for p in resto))].take(candidatas)
+        mascara = np.ones(len(candidatas), dtype=bool)
+        for predicado in resto:
+            np.logical_and(mascara, predicado.mascara(subconjunto), out=mascara)
+        return candidatas[mascara]
+
+    def _evaluar(self, predicados):
+        if self.indice is not None:
+            indexados = [p for p in predicados if isinstance(p, Rango) and p.columna in self.indice]
+            if indexados:
+                return self._evaluar_con_indice(predicados, indexados)
+        mascara = np.ones(len(self.df), dtype=bool)
+        resto = predicados
+        if self.usa_numexpr:
+            rangos = [
+                p for p in predicados
+                if isinstance(p, Rango) and not self.df[p.columna].hasnans and p.comparaciones(self.df[p.columna])
+            ]
+            if rangos:
+                mascara = self._mascara_numexpr(rangos)
+                resto = [p for p in predicados if p not in rangos]
+        for predicado in resto:
+            np.logical_and(mascara, predicado.mascara(self.df), out=mascara)
+        return np.flatnonzero(mascara)
+
+    def filas(self, predicados):
+        """Posiciones de las filas que cumplen todos los `predicados`.
+
+        Sin predicados devuelve None (todas las filas). El arreglo se
+        comparte entre sesiones: no modificarlo.
+        """
+        if not predicados:
+            return None
+        llave = llave_plan(predicados)
+        with self._lock:
+            if llave in self._resultados:
+                self._resultados.move_to_end(llave)
+                return self._resultados[llave]
+        filas = self._evaluar(list({p.llave: p for p in predicados}.values()))
+        with self._lock:
+            self._resultados[llave] = filas
+            while len(self._resultados) > self.max_resultados:
+                self._resultados.popitem(last=False)
+        return filas
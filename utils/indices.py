@@ -0,0 +1,152 @@
+"""Índices en memoria para filtrar DataFrames sin recorrer todas las filas.
+
+`IndiceValores` guarda, para cada columna indexada, el código de cada fila
+(el tipo entero más angosto que alcance) y las posiciones de las filas
+agrupadas por valor. Un filtro se resuelve marcando las posiciones de los
+valores elegidos, o con una tabla de búsqueda sobre los códigos cuando
+los elegidos cubren muchas filas; la memoria crece con n y no con la cantidad
+de valores distintos, así que sirve también para columnas como MUNICIPIO.
+
+`IndiceRango` guarda, para cada columna numérica o de fechas, la
+permutación de las filas ordenadas por valor. Un rango se resuelve con dos
+búsquedas binarias y devuelve una rebanada de esa permutación: el costo
+crece con log n y con el tamaño del resultado, no con el de la tabla.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Por debajo de esta fracción de filas se marcan posiciones en vez de
+# recorrer todos los códigos.
+FRACCION_POSICIONES = 1 / 16
+
+
+class IndiceValores:
+    def __init__(self, df, columnas):
+        self.n = len(df)
+        self.valores = {}
+        self._posiciones = {}
+        self._codigos = {}
+        self._orden = {}
+        self._limites = {}
+        tipo_orden = np.int32 if self.n < 2**31 else np.int64
+        for columna in columnas:
+            codigos, unicos = pd.factorize(df[columna], sort=True)
+            valores = unicos.tolist()
+            tipo = np.result_type(np.int8, np.min_scalar_type(len(valores)))
+            conteos = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+            # Filas no nulas agrupadas por código; el grupo i va de
+            # limites[i] a limites[i + 1].
+            orden = np.argsort(codigos, kind='stable')[np.count_nonzero(codigos < 0):]
+            self.valores[columna] = valores
+            self._posiciones[columna] = {valor: i for i, valor in enumerate(valores)}
+            self._codigos[columna] = codigos.astype(tipo)
+            self._orden[columna] = orden.astype(tipo_orden)
+            self._limites[columna] = np.concatenate([[0], np.cumsum(conteos)])
+
+    def _mascara_columna(self, columna, seleccion):
+        posiciones = self._posiciones[columna]
+        elegidos = sorted({posiciones[v] for v in seleccion if v in posiciones})
+        limites = self._limites[columna]
+        filas = int(np.diff(limites)[elegidos].sum())
+        if filas < self.n * FRACCION_POSICIONES:
+            mascara = np.zeros(self.n, dtype=bool)
+            orden = self._orden[columna]
+            for i in elegidos:
+                mascara[orden[limites[i]:limites[i + 1]]] = True
+            return mascara
+        # Tabla con un lugar extra al final: los nulos (código -1) caen ahí.
+        tabla = np.zeros(len(limites), dtype=bool)
+        tabla[elegidos] = True
+        return tabla[self._codigos[columna]]
+
+    def mascara(self, filtros):
+        """Máscara booleana de las filas que cumplen todos los filtros.
+
+        `filtros` es un diccionario `{columna: valores_permitidos}`.
+        """
+        resultado = None
+        for columna, seleccion in filtros.items():
+            mascara = self._mascara_columna(columna, seleccion)
+            if resultado is None:
+                resultado = mascara
+            else:
+                np.logical_and(resultado, mascara, out=resultado)
+        if resultado is None:
+            return np.ones(self.n, dtype=bool)
+        return resultado
+
+    def filas(self, filtros):
+        """Posiciones (para `iloc`/`take`) de las filas que cumplen los filtros."""
+        return np.flatnonzero(self.mascara(filtros))
+
+
+def permutacion_ordenada(serie, descendente=False):
+    """Posiciones de `serie` ordenadas por valor; los nulos van al final.
+
+    Se calcula una vez y sirve para mostrar cualquier subconjunto de filas en
+    orden sin volver a ordenar (ver `utils.tabla.tabla_paginada`).
+    """
+    nulos = serie.isna().to_numpy()
+    valores = serie.to_numpy()
+    validas = np.flatnonzero(~nulos)
+    orden = validas[np.argsort(valores[validas], kind='stable')]
+    if descendente:
+        orden = orden[::-1]
+    return np.concatenate([orden, np.flatnonzero(nulos)])
+
+
+class IndiceRango:
+    def __init__(self, df, columnas):
+        self.n = len(df)
+        self._orden = {}
+        self._claves = {}
+        self._fechas = set()
+        for columna in columnas:
+            serie = df[columna]
+            valores = serie.to_numpy()
+            if valores.dtype.kind == "M":
+                # Las fechas se comparan como enteros en ns.
+                valores = valores.view("int64")
+                self._fechas.add(columna)
+            orden = permutacion_ordenada(serie)[:serie.count()]
+            self._orden[columna] = orden
+            self._claves[columna] = valores[orden]
+
+    def __contains__(self, columna):
+        return columna in self._orden
+
+    def _clave(self, columna, valor):
+        if columna in self._fechas:
+            return pd.Timestamp(valor).as_unit("ns").value
+        return valor
+
+    def rebanada(self, columna, minimo=None, maximo=None, incluir_minimo=True, incluir_maximo=True):
+        """`slice` de la permutación ordenada con las filas dentro del rango.
+
+        Cada extremo es opcional y puede ser estricto; los nulos nunca entran.
+        """
+        claves = self._claves[columna]
+        inicio, fin = 0, len(claves)
+        if minimo is not None:
+            lado = "left" if incluir_minimo else "right"
+            inicio = int(np.searchsorted(claves, self._clave(columna, minimo), side=lado))
+        if maximo is not None:
+            lado = "right" if incluir_maximo else "left"
+            fin = int(np.searchsorted(claves, self._clave(columna, maximo), side=lado))
+        return slice(inicio, max(inicio, fin))
+
+    def contar(self, columna, *limites, **opciones):
+        """Número de filas en el rango (sólo las dos búsquedas binarias)."""
+        rebanada = self.rebanada(columna, *limites, **opciones)
+        return rebanada.stop - rebanada.start
+
+    def filas(self, columna, *limites, ordenadas=True, **opciones):
+        """Posiciones (para `iloc`/`take`) de las filas en el rango.
+
+        Con `ordenadas=True` quedan en el orden de la tabla (se ordena sólo el
+        resultado); si no, en orden de valor y como vista de la permutación
+        compartida, que no se debe modificar.
+        """
+        posiciones = self._orden[columna][self.rebanada(columna, *limites, **opciones)]
+        return np.sort(posiciones) if ordenadas else posiciones
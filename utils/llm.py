@@ -0,0 +1,104 @@
+"""Acceso al modelo de lenguaje usado por el chat del Proyecto Integrador.
+
+`obtener_modelo` devuelve el modelo de Gemini o, si la variable de entorno
+`LLM_LOCAL` está definida, un `ModeloLocal` que responde sin red. Ambos
+exponen `generate_content(prompt, stream=False, request_options=None)`; la
+respuesta (o cada fragmento, con `stream=True`) tiene el atributo `text`.
+Con `request_options={"timeout": segundos}` la llamada falla al agotarse
+ese tiempo en vez de quedar esperando.
+"""
+import os
+import time
+
+
+class RespuestaLocal:
+    def __init__(self, text):
+        self.text = text
+
+
+class ModeloLocal:
+    """Modelo de prueba que no usa la red: resume el prompt recibido.
+
+    `retardo` son los segundos de espera antes de cada fragmento, para
+    simular la latencia de un modelo real. Si la espera supera el `timeout`
+    de `request_options`, se lanza `TimeoutError`.
+    """
+
+    def __init__(self, nombre="local", retardo=0.0):
+        self.nombre = nombre
+        self.retardo = retardo
+        self.prompts = []
+
+    def _texto(self, prompt):
+        pregunta = prompt.rsplit("Pregunta:", 1)[-1].strip()
+        return (
+            f"[{self.nombre}] Respuesta local a «{pregunta}» "
+            f"con un contexto de {len(prompt)} caracteres."
+        )
+
+    def _esperar(self, limite):
+        if limite is None or time.monotonic() + self.retardo <= limite:
+            time.sleep(self.retardo)
+            return
+        time.sleep(max(0.0, limite - time.monotonic()))
+        raise TimeoutError("el modelo local superó el tiempo máximo")
+
+    def _fragmentos(self, texto, limite):
+        for palabra in texto.split(" "):
+            self._esperar(limite)
+            yield RespuestaLocal(palabra + " ")
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        self.prompts.append(prompt)
+        timeout = (request_options or {}).get("timeout")
+        limite = None if timeout is None else time.monotonic() + timeout
+        texto = self._texto(prompt)
+        if stream:
+            return self._fragmentos(texto, limite)
+        self._esperar(limite)
+        return RespuestaLocal(texto)
+
+
+def transmitir_respuesta(modelo, prompt, metricas, timeout=None):
+    """Genera el texto de la respuesta fragmento a fragmento.
+
+    `timeout` (segundos) se pasa al modelo como tiempo máximo de la
+    llamada completa. En `metricas` deja `primer_token` y
+    `total` (segundos desde la llamada), `fragmentos` y `cancelado`, que
+    queda en True si el generador se cierra antes de terminar (por ejemplo,
+    cuando el usuario vuelve a ejecutar la página).
+    """
+    inicio = time.perf_counter()
+    metricas.update(primer_token=None, total=None, fragmentos=0, cancelado=True)
+    opciones = None if timeout is None else {"timeout": timeout}
+    flujo = modelo.generate_content(prompt, stream=True, request_options=opciones)
+    try:
+        for fragmento in flujo:
+            if metricas["primer_token"] is None:
+                metricas["primer_token"] = time.perf_counter() - inicio
+            metricas["fragmentos"] += 1
+            yield fragmento.text
+        metricas["cancelado"] = False
+    finally:
+        metricas["total"] = time.perf_counter() - inicio
+        cerrar = getattr(flujo, "close", None)
+        if cerrar is not None:
+            cerrar()
+
+
+def usar_modelo_local():
+    return bool(os.environ.get("LLM_LOCAL"))
+
+
+def identificador_modelo(nombre):
+    """Nombre del modelo que realmente responde (distingue el local)."""
+    return f"local:{nombre}" if usar_modelo_local() else nombre
+
+
+def obtener_modelo(nombre):
+    """Devuelve el modelo `nombre` de Gemini o el modelo local de prueba."""
+    if usar_modelo_local():
+        return ModeloLocal(nombre, retardo=float(os.environ.get("LLM_LOCAL_RETARDO", 0)))
+    import google.generativeai as genai
+
+    return genai.GenerativeModel(nombre)
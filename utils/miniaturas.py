@@ -0,0 +1,67 @@
+"""Miniaturas de imágenes generadas una sola vez.
+
+Cada variante se identifica por (archivo, mtime, tamaño, alto o ancho
+deseado, formato) y se guarda en disco; al cambiar la foto cambia la
+llave y se vuelve a generar. Los bytes se pasan directamente a
+`st.image`, sin decodificar ni redimensionar en cada rerun.
+"""
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, features
+
+from utils.snapshot import escribir_atomico
+
+DIRECTORIO_MINIATURAS = Path(".cache") / "miniaturas"
+FORMATO = "WEBP" if features.check("webp") else "JPEG"
+CALIDAD = 85
+EXTENSIONES = {"WEBP": ".webp", "JPEG": ".jpg", "PNG": ".png"}
+
+
+def _redimensionar(ruta, alto, ancho, formato):
+    with Image.open(ruta) as imagen:
+        w, h = imagen.size
+        if alto is not None:
+            destino = (max(1, round(w * alto / h)), alto)
+        else:
+            destino = (ancho, max(1, round(h * ancho / w)))
+        # En JPEG, `draft` decodifica directamente a una escala reducida.
+        imagen.draft("RGB", destino)
+        if formato == "JPEG" and imagen.mode not in ("RGB", "L"):
+            imagen = imagen.convert("RGB")
+        salida = io.BytesIO()
+        imagen.resize(destino, Image.LANCZOS).save(salida, formato, quality=CALIDAD)
+    return salida.getvalue()
+
+
+@lru_cache(maxsize=64)
+def _miniatura(ruta, mtime_ns, tamano, alto, ancho, formato):
+    llave = f"{os.path.abspath(ruta)}\0{mtime_ns}\0{tamano}\0{alto}\0{ancho}\0{formato}\0{CALIDAD}"
+    nombre = hashlib.sha256(llave.encode("utf-8")).hexdigest()[:24] + EXTENSIONES[formato]
+    destino = DIRECTORIO_MINIATURAS / nombre
+    try:
+        return destino.read_bytes()
+    except FileNotFoundError:
+        pass
+    datos = _redimensionar(ruta, alto, ancho, formato)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    escribir_atomico(destino, lambda temporal: temporal.write_bytes(datos))
+    return datos
+
+
+def miniatura(ruta, alto=None, ancho=None, formato=FORMATO):
+    """Bytes de `ruta` redimensionada a `alto` o `ancho` píxeles (uno de los dos)."""
+    if (alto is None) == (ancho is None):
+        raise ValueError("Indica exactamente uno de `alto` o `ancho`.")
+    info = os.stat(ruta)
+    return _miniatura(str(ruta), info.st_mtime_ns, info.st_size, alto, ancho, formato)
+
+
+def miniaturas(rutas, alto=None, ancho=None, formato=FORMATO, trabajadores=4):
+    """Como `miniatura` para varias rutas; las que falten se generan en paralelo."""
+    with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+        return list(ejecutor.map(lambda ruta: miniatura(ruta, alto, ancho, formato), rutas))
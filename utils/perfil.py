@@ -0,0 +1,237 @@
+"""Perfil de un CSV en una sola pasada por bloques.
+
+Reemplaza a `df.info()` y `df.describe(include='all')` sin cargar el archivo
+completo en memoria: el CSV se lee con `pd.read_csv(chunksize=...)` y cada
+bloque actualiza, por columna:
+
+- nulos, memoria y tipo (promovido entre bloques como lo haría pandas);
+- momentos acumulados (conteo, media y suma de cuadrados, fusionados con la
+  fórmula de Chan) para la media y la desviación estándar, más mínimo y
+  máximo;
+- una muestra de reservorio para los cuartiles (exactos si la columna tiene
+  menos valores que el tamaño de la muestra);
+- un contador Misra-Gries para `top`/`freq` y un HyperLogLog para `unique`
+  (ambos exactos mientras haya pocos valores distintos).
+
+El perfil se guarda en caché por el hash del archivo.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.snapshot import hash_vigente
+
+FILAS_POR_BLOQUE = 50_000
+TAMANO_MUESTRA = 10_000
+MAX_CONTADORES = 1_000
+# HyperLogLog con 2**14 registros: error relativo cercano al 0.8%.
+BITS_HLL = 14
+
+
+class _HyperLogLog:
+    def __init__(self, bits=BITS_HLL):
+        self.bits = bits
+        self.registros = np.zeros(1 << bits, dtype=np.uint8)
+
+    def agregar(self, hashes):
+        resto = 64 - self.bits
+        indices = (hashes >> np.uint64(resto)).astype(np.intp)
+        cola = hashes & np.uint64((1 << resto) - 1)
+        # Posición del primer bit en 1 dentro de los `resto` bits restantes.
+        rangos = np.full(len(cola), resto + 1, dtype=np.uint8)
+        positivos = cola > 0
+        rangos[positivos] = resto - np.floor(np.log2(cola[positivos].astype(np.float64))).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rangos)
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimado = alfa * m * m / np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        vacios = int(np.count_nonzero(self.registros == 0))
+        if estimado <= 2.5 * m and vacios:
+            estimado = m * math.log(m / vacios)
+        return int(round(estimado))
+
+
+class _Columna:
+    """Acumulador de una columna a lo largo de los bloques."""
+
+    def __init__(self, nombre, rng, muestra=TAMANO_MUESTRA, max_contadores=MAX_CONTADORES):
+        self.nombre = nombre
+        self.rng = rng
+        self.dtype = None
+        self.filas = 0
+        self.no_nulos = 0
+        self.memoria = 0
+        # Momentos.
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.muestra = np.empty(muestra, dtype=np.float64)
+        # Frecuencias.
+        self.max_contadores = max_contadores
+        self.contadores = pd.Series(dtype="int64")
+        self.recortado = False
+        self.hll = _HyperLogLog()
+
+    def agregar(self, serie):
+        self.dtype = serie.dtype if self.dtype is None else _promover(self.dtype, serie.dtype)
+        self.filas += len(serie)
+        self.memoria += int(serie.memory_usage(index=False, deep=True))
+        valores = serie.dropna()
+        self.no_nulos += len(valores)
+        if not len(valores):
+            return
+        if _es_numerica(serie.dtype):
+            numeros = valores.to_numpy(dtype=np.float64)
+            self._momentos(numeros)
+            self._muestrear(numeros)
+            # Se hashea como float para que 5 y 5.0 cuenten como el mismo valor.
+            valores = pd.Series(numeros)
+        self._frecuencias(valores)
+
+    def _momentos(self, x):
+        n_b = len(x)
+        media_b = float(x.mean())
+        m2_b = float(((x - media_b) ** 2).sum())
+        n = self.n + n_b
+        delta = media_b - self.media
+        self.media += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+        self.minimo = min(self.minimo, float(x.min()))
+        self.maximo = max(self.maximo, float(x.max()))
+
+    def _muestrear(self, x):
+        # Algoritmo R vectorizado: el valor i-ésimo entra con probabilidad k/(i+1).
+        k = len(self.muestra)
+        vistos = self.n - len(x)
+        llenar = max(0, min(k - vistos, len(x)))
+        self.muestra[vistos:vistos + llenar] = x[:llenar]
+        resto = x[llenar:]
+        if len(resto):
+            posiciones = np.arange(vistos + llenar, vistos + len(x)) + 1
+            destinos = self.rng.integers(0, posiciones)
+            entran = destinos < k
+            self.muestra[destinos[entran]] = resto[entran]
+
+    def _frecuencias(self, valores):
+        self.hll.agregar(pd.util.hash_pandas_object(valores, index=False).to_numpy())
+        cuentas = valores.value_counts(sort=False)
+        if len(self.contadores):
+            cuentas = self.contadores.add(cuentas, fill_value=0).astype("int64")
+        self.contadores = cuentas
+        if len(self.contadores) > self.max_contadores:
+            # Misra-Gries: se descuenta el (k+1)-ésimo conteo a todos.
+            corte = self.contadores.nlargest(self.max_contadores + 1).iloc[-1]
+            self.contadores = self.contadores[self.contadores > corte] - corte
+            self.recortado = True
+
+    def resumen(self):
+        resumen = {"columna": self.nombre, "dtype": self.dtype, "no_nulos": self.no_nulos, "memoria": self.memoria}
+        if self.no_nulos and self.dtype is not None and _es_numerica(self.dtype):
+            muestra = self.muestra[:min(self.n, len(self.muestra))]
+            q1, q2, q3 = np.quantile(muestra, [0.25, 0.5, 0.75])
+            resumen.update({
+                "mean": self.media,
+                "std": math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else math.nan,
+                "min": self.minimo, "25%": q1, "50%": q2, "75%": q3, "max": self.maximo,
+            })
+        elif self.no_nulos:
+            top = self.contadores.idxmax()
+            resumen.update({
+                "unique": self.hll.estimar() if self.recortado else len(self.contadores),
+                "top": top,
+                "freq": self.contadores[top],
+            })
+        return resumen
+
+
+def _es_numerica(dtype):
+    return dtype.kind in "iuf"
+
+
+def _promover(a, b):
+    if a == b:
+        return a
+    if _es_numerica(a) and _es_numerica(b):
+        return np.result_type(a, b)
+    return np.dtype(object)
+
+
+def _formato_bytes(num):
+    for unidad in ("bytes", "KB", "MB", "GB", "TB"):
+        if num < 1024.0:
+            return f"{num:3.1f} {unidad}"
+        num /= 1024.0
+    return f"{num:3.1f} PB"
+
+
+class Perfil:
+    """Resultado de `perfilar_csv`: filas y resumen por columna."""
+
+    def __init__(self, filas, columnas):
+        self.filas = filas
+        self.columnas = columnas
+
+    @property
+    def memoria(self):
+        return pd.RangeIndex(self.filas).memory_usage() + sum(c["memoria"] for c in self.columnas)
+
+    def info(self):
+        """Texto con el formato de `df.info()` (memoria medida con `deep=True`)."""
+        lineas = ["<class 'pandas.core.frame.DataFrame'>"]
+        if self.filas:
+            lineas.append(f"RangeIndex: {self.filas} entries, 0 to {self.filas - 1}")
+        else:
+            lineas.append("RangeIndex: 0 entries")
+        lineas.append(f"Data columns (total {len(self.columnas)} columns):")
+        tabla = [(str(i), c["columna"], f"{c['no_nulos']} non-null", str(c["dtype"])) for i, c in enumerate(self.columnas)]
+        encabezado = (" #", "Column", "Non-Null Count", "Dtype")
+        separador = ("---", "------", "--------------", "-----")
+        anchos = [max(len(fila[j]) for fila in [encabezado, separador, *tabla]) for j in range(4)]
+        for fila in [encabezado, separador, *[(" " + f[0], *f[1:]) for f in tabla]]:
+            lineas.append("  ".join(valor.ljust(ancho) for valor, ancho in zip(fila, anchos)))
+        tipos = pd.Series([str(c["dtype"]) for c in self.columnas]).value_counts().sort_index()
+        lineas.append("dtypes: " + ", ".join(f"{tipo}({n})" for tipo, n in tipos.items()))
+        lineas.append(f"memory usage: {_formato_bytes(self.memoria)}")
+        return "\n".join(lineas) + "\n"
+
+    def describe(self):
+        """DataFrame con las filas de `df.describe(include='all')`."""
+        filas = [f for f in ("count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max")
+                 if f == "count" or any(f in c for c in self.columnas)]
+        datos = {}
+        for c in self.columnas:
+            valores = [c["no_nulos"] if f == "count" else c.get(f, np.nan) for f in filas]
+            # Como en pandas: columnas numéricas en float, el resto como object.
+            datos[c["columna"]] = pd.Series(valores, index=filas, dtype="float64" if "mean" in c else object)
+        return pd.DataFrame(datos, index=filas)
+
+
+def perfilar_csv(ruta, filas_por_bloque=FILAS_POR_BLOQUE, muestra=TAMANO_MUESTRA, semilla=0, **opciones_csv):
+    """Perfil de `ruta` leído por bloques de `filas_por_bloque` filas, en una pasada."""
+    rng = np.random.default_rng(semilla)
+    columnas = {}
+    filas = 0
+    for bloque in pd.read_csv(ruta, chunksize=filas_por_bloque, **opciones_csv):
+        filas += len(bloque)
+        for nombre in bloque.columns:
+            if nombre not in columnas:
+                columnas[nombre] = _Columna(nombre, rng, muestra)
+            columnas[nombre].agregar(bloque[nombre])
+    return Perfil(filas, [c.resumen() for c in columnas.values()])
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _perfil_en_cache(ruta, digest):
+    return perfilar_csv(ruta)
+
+
+def perfil_csv(ruta):
+    """`perfilar_csv` en caché por el hash del archivo (se recalcula si cambia)."""
+    return _perfil_en_cache(str(ruta), hash_vigente(ruta))
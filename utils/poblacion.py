@@ -0,0 +1,72 @@
+"""Población simulada para la Actividad 3 del Momento 2.
+
+Genera todas las columnas de una vez con un `numpy.random.Generator`, sin
+ciclos de Python, de modo que producir millones de filas toma una fracción
+de segundo. La misma `(semilla, n)` produce siempre los mismos datos; el
+resultado se guarda en caché y se comparte entre sesiones, así los filtros
+actúan sobre datos que no cambian entre reruns.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.filtros import MotorFiltros
+
+NOMBRES = ['Ana', 'Luis', 'Carlos', 'María', 'Pedro', 'Laura', 'Jorge', 'Sofía', 'Andrés', 'Valentina']
+CIUDADES = ['Bogotá', 'Medellín', 'Cali', 'Barranquilla', 'Cartagena']
+OCUPACIONES = ['Estudiante', 'Empleado', 'Desempleado', 'Independiente', 'Docente', 'Ingeniero', 'Médico', 'Emprendedor', 'Pensionado']
+VIVIENDAS = ['Propia', 'Arriendo', 'Familiar']
+SECTORES = ['Salud', 'Educación', 'Tecnología', 'Comercio', 'Otro']
+REGIONES = ['Andina', 'Caribe', 'Pacífica', 'Orinoquía', 'Amazonía']
+
+EDAD_MIN, EDAD_MAX = 15, 75
+INGRESO_MIN, INGRESO_MAX = 800_000, 12_000_000
+PROPORCION_SIN_INGRESO = 0.05
+NACIMIENTO_MIN = np.datetime64("1949-01-01")
+NACIMIENTO_MAX = np.datetime64("2009-12-31")
+SEMILLA = 42
+COLUMNAS_RANGO = ('edad', 'ingreso_mensual', 'fecha_nacimiento')
+
+
+def _elegir(rng, opciones, n):
+    return pd.Categorical.from_codes(rng.integers(0, len(opciones), n), categories=opciones)
+
+
+def generar_poblacion(n=100, semilla=SEMILLA):
+    """DataFrame de `n` personas simuladas con las columnas de la actividad.
+
+    Las columnas de texto son categóricas; `ingreso_mensual` es float con
+    NaN en cerca del 5% de las filas.
+    """
+    rng = np.random.default_rng(semilla)
+    ingreso = rng.integers(INGRESO_MIN, INGRESO_MAX, n, endpoint=True).astype("float64")
+    ingreso[rng.random(n) < PROPORCION_SIN_INGRESO] = np.nan
+    dias = (NACIMIENTO_MAX - NACIMIENTO_MIN).astype(int)
+    nacimiento = NACIMIENTO_MIN + rng.integers(0, dias, n, endpoint=True).astype("timedelta64[D]")
+    return pd.DataFrame({
+        'nombre_completo': _elegir(rng, NOMBRES, n),
+        'municipio': _elegir(rng, CIUDADES, n),
+        'edad': rng.integers(EDAD_MIN, EDAD_MAX, n, endpoint=True),
+        'ocupacion': _elegir(rng, OCUPACIONES, n),
+        'tipo_vivienda': _elegir(rng, VIVIENDAS, n),
+        'sector': _elegir(rng, SECTORES, n),
+        'region': _elegir(rng, REGIONES, n),
+        'ingreso_mensual': ingreso,
+        'acceso_internet': rng.random(n) < 0.5,
+        'fecha_nacimiento': nacimiento.astype("datetime64[ns]"),
+    })
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def poblacion(n=100, semilla=SEMILLA):
+    """`generar_poblacion` en caché por (n, semilla); compartido, no modificar."""
+    return generar_poblacion(n, semilla)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def filtros_poblacion(n=100, semilla=SEMILLA):
+    """Motor de filtros (con sus resultados en caché) sobre `poblacion(n, semilla)`.
+
+    Los rangos de edad, ingreso y fecha de nacimiento usan un índice ordenado.
+    """
+    return MotorFiltros(poblacion(n, semilla), columnas_indexadas=COLUMNAS_RANGO)
@@ -0,0 +1,68 @@
+"""Recursos estáticos de la página de inicio.
+
+El manifiesto se arma una vez por proceso: la hoja de estilos y el logo
+SVG se leen, se minifican y se guardan con el hash de su contenido, de modo
+que los reruns no vuelven a leer ni transformar archivos.
+
+Los binarios (por ejemplo, la foto) se publican en `static/`, que
+Streamlit sirve en `app/static/` con `server.enableStaticServing`. El
+nombre lleva el hash y la URL el parámetro `v`, con lo que el navegador
+los guarda por tiempo indefinido y cada rerun sólo envía la URL. Streamlit
+sirve los `.svg` y `.css` de esa carpeta como `text/plain`, por eso esos
+dos se siguen incrustando, ya minificados.
+"""
+import hashlib
+import re
+from pathlib import Path
+
+import streamlit as st
+
+from utils.snapshot import escribir_atomico
+
+DIRECTORIO_ESTATICO = Path("static")
+URL_ESTATICA = "app/static"
+RUTA_ESTILOS = Path("assets") / "inicio.css"
+RUTA_LOGO = Path("assets") / "logo-Cesde-2023.svg"
+ANCHO_LOGO = 300
+
+
+class Recurso:
+    def __init__(self, contenido):
+        self.contenido = contenido
+        self.hash = hashlib.sha256(contenido.encode("utf-8")).hexdigest()[:12]
+
+
+def minificar_css(texto):
+    texto = re.sub(r"/\*.*?\*/", "", texto, flags=re.S)
+    texto = re.sub(r"\s+", " ", texto)
+    texto = re.sub(r"\s*([{};:,>])\s*", r"\1", texto)
+    return texto.replace(";}", "}").strip()
+
+
+def minificar_svg(texto):
+    texto = re.sub(r"<\?xml.*?\?>|<!--.*?-->", "", texto, flags=re.S)
+    texto = re.sub(r">\s+<", "><", texto)
+    return re.sub(r"\s+", " ", texto).strip()
+
+
+@st.cache_resource(show_spinner=False)
+def manifiesto():
+    """Devuelve {"estilos": Recurso, "logo": Recurso} (se arma una vez por proceso)."""
+    estilos = minificar_css(RUTA_ESTILOS.read_text(encoding="utf-8"))
+    logo = minificar_svg(RUTA_LOGO.read_text(encoding="utf-8"))
+    logo = logo.replace('viewBox="0 0 264 53"', f'viewBox="0 0 264 53" width="{ANCHO_LOGO}"', 1)
+    return {"estilos": Recurso(estilos), "logo": Recurso(logo)}
+
+
+def publicar(datos, nombre, extension):
+    """Copia `datos` a `static/` con el hash en el nombre y devuelve su URL versionada."""
+    huella = hashlib.sha256(datos).hexdigest()[:12]
+    archivo = f"{nombre}-{huella}{extension}"
+    destino = DIRECTORIO_ESTATICO / archivo
+    if not destino.exists():
+        DIRECTORIO_ESTATICO.mkdir(parents=True, exist_ok=True)
+        escribir_atomico(destino, lambda temporal: temporal.write_bytes(datos))
+        for anterior in DIRECTORIO_ESTATICO.glob(f"{nombre}-*{extension}"):
+            if anterior != destino:
+                anterior.unlink(missing_ok=True)
+    return f"{URL_ESTATICA}/{archivo}?v={huella}"
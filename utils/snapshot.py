@@ -0,0 +1,291 @@
+"""Instantáneas Arrow de archivos CSV compartidas entre sesiones.
+
+El CSV se convierte una sola vez a archivos Feather (Arrow IPC) sin
+comprimir que luego se abren con memory-map, de modo que todas las
+sesiones leen las mismas páginas del sistema operativo en lugar de volver
+a parsear el texto en cada rerun.
+
+Una instantánea puede tener varias partes. En modo incremental, cuando al
+CSV sólo se le agregaron filas al final, se parsean únicamente los bytes
+nuevos (desde el último desplazamiento consumido) y se guardan como una
+parte adicional. Se asume un registro por línea, como en los exportes
+que usa la aplicación.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+DIRECTORIO_CACHE = Path(".cache") / "snapshots"
+# Con más partes que esto, se fusionan en una sola (sin volver a parsear).
+MAX_PARTES = 16
+BYTES_COLA = 4096
+
+
+def huella_archivo(ruta):
+    """Devuelve (mtime en ns, tamaño en bytes) del archivo."""
+    info = os.stat(ruta)
+    return info.st_mtime_ns, info.st_size
+
+
+def hash_archivo(ruta, bloque=1 << 20):
+    """Calcula el SHA-256 del archivo leyéndolo por bloques."""
+    digest = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for parte in iter(lambda: archivo.read(bloque), b""):
+            digest.update(parte)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=128)
+def _hash_por_huella(ruta, mtime_ns, tamano):
+    return hash_archivo(ruta)
+
+
+def hash_vigente(ruta):
+    """SHA-256 del archivo, recalculado sólo si cambian su mtime o su tamaño."""
+    return _hash_por_huella(str(ruta), *huella_archivo(ruta))
+
+
+def _sha(datos):
+    return hashlib.sha256(datos).hexdigest()
+
+
+def _leer_meta(ruta_meta):
+    try:
+        with open(ruta_meta, "r", encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def escribir_atomico(ruta, escribir):
+    """Llama a `escribir(temporal)` y reemplaza `ruta` con el resultado de una vez.
+
+    El temporal tiene un nombre único en el mismo directorio, así varias
+    sesiones (hilos) o procesos pueden escribir el mismo destino a la vez
+    sin pisarse; si `escribir` falla, se borra.
+    """
+    ruta = Path(ruta)
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, prefix=f"{ruta.name}.", suffix=".tmp")
+    os.close(descriptor)
+    try:
+        escribir(Path(temporal))
+        os.replace(temporal, ruta)
+    except BaseException:
+        Path(temporal).unlink(missing_ok=True)
+        raise
+
+
+def _escribir_json(ruta, datos):
+    def escribir(temporal):
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo)
+
+    escribir_atomico(ruta, escribir)
+
+
+def _normalizar_diccionarios(tabla):
+    # Índices int32 en todas las columnas de diccionario para que las partes
+    # tengan el mismo esquema aunque cambie el número de categorías.
+    campos = [
+        pa.field(c.name, pa.dictionary(pa.int32(), c.type.value_type), c.nullable)
+        if pa.types.is_dictionary(c.type) else c
+        for c in tabla.schema
+    ]
+    return tabla.cast(pa.schema(campos, metadata=tabla.schema.metadata))
+
+
+def _guardar_parte(tabla, ruta):
+    escribir_atomico(
+        ruta,
+        lambda temporal: feather.write_feather(
+            _normalizar_diccionarios(tabla), temporal, compression="uncompressed"
+        ),
+    )
+
+
+def _transformar(transformar, fuente, primera_fila):
+    resultado = transformar(fuente, primera_fila)
+    if isinstance(resultado, tuple):
+        return resultado
+    return resultado, None
+
+
+def _leer_encabezado(archivo):
+    archivo.seek(0)
+    return archivo.readline()
+
+
+def _fin_ultima_linea(archivo, tamano, bloque=BYTES_COLA):
+    """Posición justo después del último salto de línea antes de `tamano` (0 si no hay)."""
+    fin = tamano
+    while fin > 0:
+        inicio = max(0, fin - bloque)
+        archivo.seek(inicio)
+        posicion = archivo.read(fin - inicio).rfind(b"\n")
+        if posicion >= 0:
+            return inicio + posicion + 1
+        fin = inicio
+    return 0
+
+
+def _construir_completo(ruta_csv, transformar, nombre, version_esquema, mtime, tamano):
+    with open(ruta_csv, "rb") as archivo:
+        encabezado = _leer_encabezado(archivo)
+        # El desplazamiento queda al final de la última línea completa; una
+        # última línea sin salto puede estar a medio escribir.
+        offset = _fin_ultima_linea(archivo, tamano)
+        archivo.seek(max(0, offset - BYTES_COLA))
+        cola = archivo.read(offset - archivo.tell())
+    digest = hash_archivo(ruta_csv)
+    df, extra = _transformar(transformar, ruta_csv, 0)
+    archivo_parte = f"{nombre}-{digest[:16]}-0.feather"
+    _guardar_parte(pa.Table.from_pandas(df, preserve_index=False), DIRECTORIO_CACHE / archivo_parte)
+    return {
+        "origen": str(ruta_csv),
+        "mtime_ns": mtime,
+        "tamano": tamano,
+        "sha256": digest,
+        "version_esquema": version_esquema,
+        "offset": offset,
+        # Bytes de una última línea sin salto que ya se parsearon: si el
+        # archivo crece, no se puede continuar desde `offset` sin duplicarla.
+        "pendiente": tamano - offset,
+        "filas": len(df),
+        "encabezado": _sha(encabezado),
+        "cola": _sha(cola),
+        "partes": [{"archivo": archivo_parte, "filas": len(df)}],
+        "extras": [extra],
+    }
+
+
+def _agregar_incremental(ruta_csv, transformar, nombre, previo, mtime, tamano):
+    """Parsea sólo lo agregado al CSV; devuelve None si fue reescrito."""
+    offset = previo["offset"]
+    if tamano < offset or previo.get("pendiente"):
+        return None
+    with open(ruta_csv, "rb") as archivo:
+        encabezado = _leer_encabezado(archivo)
+        inicio_cola = max(0, offset - BYTES_COLA)
+        archivo.seek(inicio_cola)
+        cola = archivo.read(offset - inicio_cola)
+        if _sha(encabezado) != previo["encabezado"] or _sha(cola) != previo["cola"]:
+            return None
+        nuevos = archivo.read(tamano - offset)
+
+    meta = dict(previo, mtime_ns=mtime, tamano=tamano)
+    # Una línea sin salto final puede estar a medio escribir: se deja para después.
+    fin = nuevos.rfind(b"\n") + 1
+    if fin == 0:
+        return meta
+    nuevos = nuevos[:fin]
+
+    df, extra = _transformar(transformar, io.BytesIO(encabezado + nuevos), previo["filas"])
+    version = _sha((previo["sha256"] + _sha(nuevos)).encode())
+    archivo_parte = f"{nombre}-{version[:16]}-{len(previo['partes'])}.feather"
+    _guardar_parte(pa.Table.from_pandas(df, preserve_index=False), DIRECTORIO_CACHE / archivo_parte)
+
+    cola = (cola + nuevos)[-BYTES_COLA:]
+    meta.update(
+        sha256=version,
+        offset=offset + fin,
+        filas=previo["filas"] + len(df),
+        cola=_sha(cola),
+        partes=previo["partes"] + [{"archivo": archivo_parte, "filas": len(df)}],
+        extras=previo["extras"] + [extra],
+    )
+    return meta
+
+
+def _compactar(meta, nombre):
+    tabla = abrir_snapshot(rutas_partes(meta))
+    archivo_parte = f"{nombre}-{meta['sha256'][:16]}-c.feather"
+    _guardar_parte(tabla.combine_chunks(), DIRECTORIO_CACHE / archivo_parte)
+    return dict(meta, partes=[{"archivo": archivo_parte, "filas": meta["filas"]}])
+
+
+def _borrar_partes_viejas(previo, meta):
+    vigentes = {p["archivo"] for p in meta["partes"]}
+    for parte in (previo or {}).get("partes", []):
+        if parte["archivo"] not in vigentes:
+            try:
+                os.remove(DIRECTORIO_CACHE / parte["archivo"])
+            except OSError:
+                # Puede seguir abierta con memory-map en otro proceso.
+                pass
+
+
+def rutas_partes(meta):
+    """Rutas de los archivos Feather que forman la instantánea."""
+    return [DIRECTORIO_CACHE / parte["archivo"] for parte in meta["partes"]]
+
+
+def asegurar_snapshot(ruta_csv, transformar, nombre=None, version_esquema=1, incremental=False):
+    """Garantiza que exista una instantánea vigente del CSV.
+
+    `transformar(fuente, primera_fila)` recibe algo que acepta
+    `pd.read_csv` (la ruta o un buffer con el encabezado y las filas
+    nuevas) y el número de filas ya consumidas. Devuelve el DataFrame limpio,
+    o una tupla (DataFrame, extra) donde `extra` es un diccionario
+    serializable a JSON que se acumula en los metadatos (ver
+    `leer_metadatos`).
+
+    La instantánea sólo se reconstruye cuando cambia el contenido del
+    archivo (o `version_esquema`); si sólo cambia el mtime y el hash es el
+    mismo, se actualizan los metadatos sin volver a parsear. Con
+    `incremental=True` las filas agregadas al final se procesan solas y la
+    reconstrucción completa ocurre sólo si cambia el encabezado, el archivo
+    se trunca o cambian los últimos bytes ya consumidos.
+
+    Devuelve la lista de rutas de las partes y la versión de la instantánea.
+    """
+    ruta_csv = Path(ruta_csv)
+    nombre = nombre or ruta_csv.stem
+    DIRECTORIO_CACHE.mkdir(parents=True, exist_ok=True)
+    ruta_meta = DIRECTORIO_CACHE / f"{nombre}.json"
+
+    mtime, tamano = huella_archivo(ruta_csv)
+    previo = _leer_meta(ruta_meta)
+    vigente = (
+        previo is not None
+        and previo.get("version_esquema") == version_esquema
+        and "partes" in previo
+        and all(ruta.exists() for ruta in rutas_partes(previo))
+    )
+
+    if vigente and previo["mtime_ns"] == mtime and previo["tamano"] == tamano:
+        return rutas_partes(previo), previo["sha256"]
+
+    meta = None
+    if vigente and incremental:
+        meta = _agregar_incremental(ruta_csv, transformar, nombre, previo, mtime, tamano)
+        if meta is not None and len(meta["partes"]) > MAX_PARTES:
+            sin_compactar = meta
+            meta = _compactar(meta, nombre)
+            _borrar_partes_viejas(sin_compactar, meta)
+    elif vigente and previo["sha256"] == hash_archivo(ruta_csv):
+        meta = dict(previo, mtime_ns=mtime, tamano=tamano)
+    if meta is None:
+        meta = _construir_completo(ruta_csv, transformar, nombre, version_esquema, mtime, tamano)
+
+    _escribir_json(ruta_meta, meta)
+    _borrar_partes_viejas(previo, meta)
+    return rutas_partes(meta), meta["sha256"]
+
+
+def abrir_snapshot(rutas):
+    """Abre las partes con memory-map y devuelve una sola tabla Arrow."""
+    tablas = [feather.read_table(ruta, memory_map=True) for ruta in rutas]
+    return tablas[0] if len(tablas) == 1 else pa.concat_tables(tablas)
+
+
+def leer_metadatos(nombre):
+    """Devuelve los metadatos guardados de la instantánea `nombre`, o None."""
+    return _leer_meta(DIRECTORIO_CACHE / f"{nombre}.json")
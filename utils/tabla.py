@@ -0,0 +1,49 @@
+"""Tabla paginada para DataFrames grandes.
+
+Sólo se serializa al navegador la página visible. El orden se toma de una
+permutación precalculada (`utils.indices.permutacion_ordenada`), de modo que
+cambiar de página o de filtro no vuelve a ordenar la tabla.
+"""
+import math
+
+import numpy as np
+import streamlit as st
+
+TAMANOS_PAGINA = (25, 50, 100, 500)
+
+
+def posiciones_visibles(n, orden=None, filas=None):
+    """Combina la permutación `orden` con el subconjunto `filas` (posiciones)."""
+    posiciones = np.arange(n) if orden is None else np.asarray(orden)
+    if filas is not None:
+        seleccion = np.zeros(n, dtype=bool)
+        seleccion[filas] = True
+        posiciones = posiciones[seleccion[posiciones]]
+    return posiciones
+
+
+def tabla_paginada(df, orden=None, filas=None, clave="tabla", tamanos=TAMANOS_PAGINA):
+    """Muestra `df` por páginas con controles de tamaño y número de página.
+
+    `orden` es una permutación de posiciones ya ordenada y `filas` las
+    posiciones a mostrar (por ejemplo, el resultado de un índice). Devuelve
+    el DataFrame de la página mostrada.
+    """
+    posiciones = posiciones_visibles(len(df), orden, filas)
+    total = len(posiciones)
+
+    col_tamano, col_pagina, col_info = st.columns([1, 1, 2])
+    with col_tamano:
+        tamano = st.selectbox("Filas por página", tamanos, key=f"{clave}_tamano")
+    paginas = max(1, math.ceil(total / tamano))
+    with col_pagina:
+        pagina = st.number_input("Página", min_value=1, max_value=paginas, value=1, step=1, key=f"{clave}_pagina")
+    pagina = min(int(pagina), paginas)
+    inicio = (pagina - 1) * tamano
+    fin = min(inicio + tamano, total)
+    with col_info:
+        st.caption(f"Filas {inicio + 1 if total else 0}–{fin} de {total} · página {pagina} de {paginas}")
+
+    visible = df.take(posiciones[inicio:fin])
+    st.dataframe(visible, use_container_width=True)
+    return visible
@@ -0,0 +1,137 @@
+"""Carga compartida del dataset de trata de personas.
+
+Las tres secciones de `Proyecto_Integrador.py` usan el mismo DataFrame: se
+construye a partir de una instantánea Arrow con memory-map y se guarda en
+un estado por proceso (`st.cache_resource`), así que todas las sesiones
+reciben el mismo objeto. Ese DataFrame es de sólo lectura; quien necesite
+modificarlo debe copiarlo.
+
+El CSV es un exporte al que sólo se le agregan filas: cuando crece, se
+parsean únicamente las filas nuevas y se suman al DataFrame y al cubo ya
+cargados (ver `utils.snapshot`).
+"""
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from utils.contexto_llm import estimar_tokens
+from utils.cubo import Cubo
+from utils.esquema import aplicar_esquema, concatenar
+from utils.indices import IndiceValores, permutacion_ordenada
+from utils.snapshot import abrir_snapshot, asegurar_snapshot, leer_metadatos
+
+RUTA_TRATA = "./pages/trata_de_personas.csv"
+FORMATO_FECHA = "%m/%d/%Y %I:%M:%S %p"
+
+# Tipos declarados: los textos repetidos van como categorías y los códigos
+# DANE como enteros angostos; los nulos se conservan con tipos nullable.
+ESQUEMA_TRATA = {
+    'FECHA HECHO': ("fecha", FORMATO_FECHA),
+    'COD_DEPTO': "UInt8",
+    'DEPARTAMENTO': "category",
+    'COD_MUNI': "UInt32",
+    'MUNICIPIO': "category",
+    'DESCRIPCION CONDUCTA': "category",
+    'CANTIDAD': "UInt16",
+}
+DIMENSIONES_CUBO = ['AÑO', 'DEPARTAMENTO', 'MUNICIPIO', 'DESCRIPCION CONDUCTA']
+COLUMNAS_INDICE = ['AÑO', 'DEPARTAMENTO', 'MUNICIPIO']
+# Cambiar cuando cambie el esquema o la limpieza para invalidar la instantánea.
+VERSION_ESQUEMA = 3
+
+
+def limpiar_trata(fuente, primera_fila=0):
+    """Lee el CSV, aplica `ESQUEMA_TRATA` y devuelve (df, {"validacion": reporte})."""
+    df = pd.read_csv(fuente, dtype=str)
+    df.columns = df.columns.str.strip().str.upper()
+    df, reporte = aplicar_esquema(df, ESQUEMA_TRATA, desfase_fila=primera_fila + 2)
+    df['AÑO'] = df['FECHA HECHO'].dt.year.astype("UInt16")
+    return df, {"validacion": reporte}
+
+
+class _EstadoTrata:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.partes = []
+        self.df = None
+        self.cubo = None
+
+
+@st.cache_resource(show_spinner=False)
+def _estado_trata():
+    return _EstadoTrata()
+
+
+def cargar_trata(ruta_csv=RUTA_TRATA):
+    """Devuelve (df, version) del dataset, procesando sólo lo que cambió."""
+    estado = _estado_trata()
+    with estado.lock:
+        partes, version = asegurar_snapshot(
+            ruta_csv, limpiar_trata, nombre="trata",
+            version_esquema=VERSION_ESQUEMA, incremental=True,
+        )
+        partes = [str(parte) for parte in partes]
+        if estado.version != version:
+            previas = len(estado.partes)
+            if estado.df is not None and 0 < previas < len(partes) and partes[:previas] == estado.partes:
+                nuevo = abrir_snapshot(partes[previas:]).to_pandas()
+                estado.df = concatenar([estado.df, nuevo])
+                estado.cubo = estado.cubo.agregar(nuevo)
+            else:
+                estado.df = abrir_snapshot(partes).to_pandas(split_blocks=True)
+                estado.cubo = Cubo(estado.df, DIMENSIONES_CUBO, 'CANTIDAD')
+            estado.version = version
+            estado.partes = partes
+        return estado.df, version
+
+
+def reporte_validacion_trata():
+    """Reporte de filas que no pasaron la conversión, sumando todas las cargas."""
+    meta = leer_metadatos("trata") or {}
+    reportes = [extra["validacion"] for extra in meta.get("extras", []) if extra]
+    if not reportes:
+        return None
+    errores = {}
+    for reporte in reportes:
+        for columna, cantidad in reporte["errores"].items():
+            previo = errores.get(columna, 0)
+            sumables = isinstance(previo, int) and isinstance(cantidad, int)
+            errores[columna] = previo + cantidad if sumables else cantidad
+    return {
+        "filas": sum(r["filas"] for r in reportes),
+        "errores": errores,
+        "muestras": [m for r in reportes for m in r["muestras"]],
+    }
+
+
+def cubo_trata(version, _df):
+    """Cubo de CANTIDAD por año, departamento, municipio y conducta.
+
+    Se mantiene junto con el DataFrame en `cargar_trata`, que lo actualiza
+    con las filas nuevas en lugar de recalcularlo.
+    """
+    estado = _estado_trata()
+    with estado.lock:
+        if estado.version == version:
+            return estado.cubo
+    return Cubo(_df, DIMENSIONES_CUBO, 'CANTIDAD')
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def indice_trata(version, _df):
+    """Índice de valores (códigos y posiciones por valor) de año, departamento y municipio."""
+    return IndiceValores(_df, COLUMNAS_INDICE)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def orden_fecha_trata(version, _df):
+    """Posiciones ordenadas por FECHA HECHO, de la más reciente a la más antigua."""
+    return permutacion_ordenada(_df['FECHA HECHO'], descendente=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def tokens_tabla_trata(version, _df):
+    """Tokens estimados de enviar la tabla completa (como CSV) en un prompt."""
+    return estimar_tokens(_df.to_csv(index=False))